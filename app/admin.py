@@ -4,6 +4,7 @@ import json
 import logging
 import os
 import shutil
+import sqlite3
 from datetime import datetime
 from typing import Optional
 
@@ -13,7 +14,7 @@ from pydantic import BaseModel
 from pathlib import Path
 
 from app.config import DATA_DIR
-from app.tools.database import get_db
+from app.tools.database import close_db, get_db
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,7 @@ async def get_settings():
     """Return all settings as key-value dict."""
     conn = get_db()
     rows = conn.execute("SELECT key, value, description, updated_at FROM settings").fetchall()
-    conn.close()
+    close_db(conn)
     return {
         "settings": [
             {"key": r["key"], "value": r["value"], "description": r["description"], "updated_at": r["updated_at"]}
@@ -59,7 +60,12 @@ async def update_setting(key: str, body: SettingUpdate):
         (body.value, key),
     )
     conn.commit()
-    conn.close()
+    close_db(conn)
+    from app.nova_sonic import invalidate_profile_cache
+    invalidate_profile_cache()
+    from app.scheduler import invalidate_settings, notify_scheduler
+    invalidate_settings()
+    notify_scheduler()
     logger.info(f"⚙️ Setting updated: {key}")
     return {"status": "ok", "key": key, "value": body.value}
 
@@ -79,7 +85,12 @@ async def create_setting(body: SettingCreate):
         (body.key, body.value, body.description),
     )
     conn.commit()
-    conn.close()
+    close_db(conn)
+    from app.nova_sonic import invalidate_profile_cache
+    invalidate_profile_cache()
+    from app.scheduler import invalidate_settings, notify_scheduler
+    invalidate_settings()
+    notify_scheduler()
     return {"status": "ok", "key": body.key}
 
 
@@ -92,7 +103,7 @@ async def list_medications():
     rows = conn.execute(
         "SELECT id, name, dosage, schedule_time, days, notes, active, created_at FROM medications ORDER BY schedule_time"
     ).fetchall()
-    conn.close()
+    close_db(conn)
     return {"medications": [dict(r) for r in rows]}
 
 
@@ -115,7 +126,9 @@ async def create_medication(body: MedicationCreate):
     )
     conn.commit()
     med_id = cursor.lastrowid
-    conn.close()
+    close_db(conn)
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
     return {"status": "ok", "id": med_id}
 
 
@@ -143,7 +156,9 @@ async def update_medication(med_id: int, body: MedicationUpdate):
         params.append(med_id)
         conn.execute(f"UPDATE medications SET {', '.join(updates)} WHERE id = ?", params)
         conn.commit()
-    conn.close()
+    close_db(conn)
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
     return {"status": "ok", "id": med_id}
 
 
@@ -153,7 +168,9 @@ async def delete_medication(med_id: int):
     conn = get_db()
     conn.execute("DELETE FROM medications WHERE id = ?", (med_id,))
     conn.commit()
-    conn.close()
+    close_db(conn)
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
     return {"status": "ok", "id": med_id}
 
 
@@ -168,7 +185,7 @@ async def list_medication_log():
         ORDER BY ml.taken_at DESC
         LIMIT 100
     """).fetchall()
-    conn.close()
+    close_db(conn)
     return {"log": [dict(r) for r in rows]}
 
 
@@ -184,7 +201,7 @@ async def list_notification_responses():
         ORDER BY created_at DESC
         LIMIT 200
     """).fetchall()
-    conn.close()
+    close_db(conn)
     return {"responses": [dict(r) for r in rows]}
 
 
@@ -194,13 +211,14 @@ async def list_medication_snoozes():
     conn = get_db()
     rows = conn.execute("""
         SELECT ms.id, ms.medication_id, m.name as medication_name,
-               ms.snooze_until, ms.created_at
+               strftime('%Y-%m-%dT%H:%M:%S', ms.snooze_until, 'unixepoch', 'localtime') as snooze_until,
+               ms.created_at
         FROM medication_snoozes ms
         LEFT JOIN medications m ON ms.medication_id = m.id
         ORDER BY ms.created_at DESC
         LIMIT 100
     """).fetchall()
-    conn.close()
+    close_db(conn)
     return {"snoozes": [dict(r) for r in rows]}
 
 
@@ -210,7 +228,7 @@ async def delete_medication_snooze(snooze_id: int):
     conn = get_db()
     conn.execute("DELETE FROM medication_snoozes WHERE id = ?", (snooze_id,))
     conn.commit()
-    conn.close()
+    close_db(conn)
     return {"status": "deleted", "id": snooze_id}
 
 
@@ -223,7 +241,7 @@ async def list_memory():
     rows = conn.execute(
         "SELECT key, value, category, updated_at FROM memory ORDER BY category, key"
     ).fetchall()
-    conn.close()
+    close_db(conn)
     return {"memory": [dict(r) for r in rows]}
 
 
@@ -242,7 +260,7 @@ async def create_memory(body: MemoryCreate):
         (body.key, body.value, body.category),
     )
     conn.commit()
-    conn.close()
+    close_db(conn)
     return {"status": "ok", "key": body.key}
 
 
@@ -252,7 +270,7 @@ async def delete_memory(key: str):
     conn = get_db()
     conn.execute("DELETE FROM memory WHERE key = ?", (key,))
     conn.commit()
-    conn.close()
+    close_db(conn)
     return {"status": "ok", "key": key}
 
 
@@ -265,7 +283,7 @@ async def list_events():
     rows = conn.execute(
         "SELECT id, title, description, event_time, reminder_minutes, morning_brief, notified, brief_sent, active, created_at FROM events ORDER BY event_time"
     ).fetchall()
-    conn.close()
+    close_db(conn)
     return {"events": [dict(r) for r in rows]}
 
 
@@ -287,7 +305,9 @@ async def create_event(body: EventCreate):
     )
     conn.commit()
     event_id = cursor.lastrowid
-    conn.close()
+    close_db(conn)
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
     return {"status": "ok", "id": event_id}
 
 
@@ -317,7 +337,9 @@ async def update_event(event_id: int, body: EventUpdate):
         params.append(event_id)
         conn.execute(f"UPDATE events SET {', '.join(updates)} WHERE id = ?", params)
         conn.commit()
-    conn.close()
+    close_db(conn)
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
     return {"status": "ok", "id": event_id}
 
 
@@ -327,7 +349,9 @@ async def delete_event(event_id: int):
     conn = get_db()
     conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
     conn.commit()
-    conn.close()
+    close_db(conn)
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
     return {"status": "ok", "id": event_id}
 
 
@@ -364,7 +388,7 @@ async def dashboard():
     sched_enabled = conn.execute("SELECT value FROM settings WHERE key = 'scheduler_enabled'").fetchone()
     sched_interval = conn.execute("SELECT value FROM settings WHERE key = 'scheduler_interval_minutes'").fetchone()
 
-    conn.close()
+    close_db(conn)
 
     # Data dir stats
     data_path = Path(DATA_DIR)
@@ -507,7 +531,7 @@ async def list_push_subscriptions():
             for r in rows
         ]
     finally:
-        db.close()
+        close_db(db)
 
 
 @router.delete("/api/admin/push-subscriptions/all")
@@ -518,10 +542,12 @@ async def delete_all_push_subscriptions():
         count = db.execute("SELECT COUNT(*) FROM push_subscriptions").fetchone()[0]
         db.execute("DELETE FROM push_subscriptions")
         db.commit()
+        from app.push import invalidate_subscriptions_cache
+        invalidate_subscriptions_cache(0)
         logger.info(f"📲 All push subscriptions deleted via admin ({count} removed)")
         return {"status": "ok", "deleted": count}
     finally:
-        db.close()
+        close_db(db)
 
 
 @router.delete("/api/admin/push-subscriptions/stale")
@@ -532,10 +558,12 @@ async def delete_stale_push_subscriptions():
         count = db.execute("SELECT COUNT(*) FROM push_subscriptions WHERE fail_count > 0").fetchone()[0]
         db.execute("DELETE FROM push_subscriptions WHERE fail_count > 0")
         db.commit()
+        from app.push import invalidate_subscriptions_cache
+        invalidate_subscriptions_cache()
         logger.info(f"📲 Stale push subscriptions deleted via admin ({count} removed)")
         return {"status": "ok", "deleted": count}
     finally:
-        db.close()
+        close_db(db)
 
 
 @router.delete("/api/admin/push-subscriptions/{sub_id}")
@@ -545,10 +573,12 @@ async def delete_push_subscription(sub_id: int):
     try:
         db.execute("DELETE FROM push_subscriptions WHERE id = ?", (sub_id,))
         db.commit()
+        from app.push import invalidate_subscriptions_cache
+        invalidate_subscriptions_cache()
         logger.info(f"📲 Push subscription {sub_id} deleted via admin")
         return {"status": "ok"}
     finally:
-        db.close()
+        close_db(db)
 
 
 # ── Helpers ───────────────────────────────────────────────────────────
@@ -564,7 +594,7 @@ async def list_contacts():
     rows = conn.execute(
         "SELECT id, name, fullname, relationship, phone, active, created_at FROM emergency_contacts ORDER BY name"
     ).fetchall()
-    conn.close()
+    close_db(conn)
     return {
         "contacts": [
             {"id": r["id"], "name": r["name"], "fullname": r["fullname"], "relationship": r["relationship"],
@@ -585,12 +615,16 @@ class ContactCreate(BaseModel):
 async def create_contact(body: ContactCreate):
     """Create a new emergency contact."""
     conn = get_db()
-    conn.execute(
-        "INSERT INTO emergency_contacts (name, fullname, relationship, phone) VALUES (?, ?, ?, ?)",
-        (body.name, body.fullname, body.relationship, body.phone),
-    )
-    conn.commit()
-    conn.close()
+    try:
+        conn.execute(
+            "INSERT INTO emergency_contacts (name, fullname, relationship, phone) VALUES (?, ?, ?, ?)",
+            (body.name, body.fullname, body.relationship, body.phone),
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        return {"status": "error", "message": f"Contact '{body.name}' already exists"}
+    finally:
+        close_db(conn)
     logger.info(f"📞 Contact created: {body.name}")
     return {"status": "ok", "name": body.name}
 
@@ -614,12 +648,16 @@ async def update_contact(contact_id: int, body: ContactUpdate):
             updates.append(f"{field} = ?")
             params.append(val)
     if not updates:
-        conn.close()
+        close_db(conn)
         return {"status": "error", "message": "No fields to update"}
     params.append(contact_id)
-    conn.execute(f"UPDATE emergency_contacts SET {', '.join(updates)} WHERE id = ?", params)
-    conn.commit()
-    conn.close()
+    try:
+        conn.execute(f"UPDATE emergency_contacts SET {', '.join(updates)} WHERE id = ?", params)
+        conn.commit()
+    except sqlite3.IntegrityError:
+        return {"status": "error", "message": f"Contact '{body.name}' already exists"}
+    finally:
+        close_db(conn)
     logger.info(f"📞 Contact updated: id={contact_id}")
     return {"status": "ok", "id": contact_id}
 
@@ -630,7 +668,7 @@ async def delete_contact(contact_id: int):
     conn = get_db()
     conn.execute("DELETE FROM emergency_contacts WHERE id = ?", (contact_id,))
     conn.commit()
-    conn.close()
+    close_db(conn)
     logger.info(f"📞 Contact deleted: id={contact_id}")
     return {"status": "ok", "id": contact_id}
 
@@ -642,7 +680,7 @@ async def list_sms_log():
         """SELECT id, contact_name, phone, message, sns_message_id, status, error_detail, created_at
            FROM sms_log ORDER BY created_at DESC LIMIT 100"""
     ).fetchall()
-    conn.close()
+    close_db(conn)
     return {
         "sms_log": [
             {"id": r["id"], "contact_name": r["contact_name"], "phone": r["phone"],
@@ -660,7 +698,7 @@ async def delete_sms_log_entry(log_id: int):
     conn = get_db()
     conn.execute("DELETE FROM sms_log WHERE id = ?", (log_id,))
     conn.commit()
-    conn.close()
+    close_db(conn)
     return {"status": "ok", "id": log_id}
 
 
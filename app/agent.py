@@ -67,7 +67,7 @@ _agent_lock = asyncio.Lock()
 def _load_user_profile_for_agent() -> dict:
     """Load user profile settings from SQLite for agent prompt personalization."""
     try:
-        from app.tools.database import get_db
+        from app.tools.database import close_db, get_db
         conn = get_db()
         profile = {}
         for key in ("user_name", "user_full_name", "user_phone"):
@@ -75,7 +75,7 @@ def _load_user_profile_for_agent() -> dict:
                 "SELECT value FROM settings WHERE key = ?", (key,)
             ).fetchone()
             profile[key] = row["value"] if row and row["value"] else ""
-        conn.close()
+        close_db(conn)
         return profile
     except Exception as e:
         logger.warning(f"⚠️ Could not load user profile for agent: {e}")
@@ -117,7 +117,7 @@ def _build_agent_system_prompt() -> str:
         "Calendar: get_upcoming_events(days), get_todays_schedule, "
         "add_event(title, event_time, description, reminder_minutes, morning_brief), "
         "cancel_event(event_title), update_event_time(event_title, new_time)\n"
-        "Memory: remember(key, value, category), recall(key, category), forget(key)\n"
+        "Memory: remember(key, value, category), remember_many(items), recall(key, category), forget(key)\n"
         "Emergency Contacts: add_emergency_contact(name, phone, fullname, relationship), "
         "get_emergency_contacts(name), remove_emergency_contact(name), "
         "update_emergency_contact(name, new_phone, new_fullname, new_relationship)\n"
@@ -222,9 +222,9 @@ def _create_strands_agent():
         logger.warning(f"  ⚠️ medication tools not available: {e}")
 
     try:
-        from app.tools.memory import remember, recall, forget
-        tools.extend([remember, recall, forget])
-        logger.info("  ✅ memory tools (3)")
+        from app.tools.memory import remember, remember_many, recall, forget
+        tools.extend([remember, remember_many, recall, forget])
+        logger.info("  ✅ memory tools (4)")
     except Exception as e:
         logger.warning(f"  ⚠️ memory tools not available: {e}")
 
@@ -368,11 +368,11 @@ async def handle_tool_call(tool_name: str, tool_content: str) -> str:
         # Inject GPS context if available
         from app.websocket_handler import get_current_gps
         gps = get_current_gps()
-        if gps.get("lat") is not None and gps.get("lon") is not None:
+        if gps.lat is not None and gps.lon is not None:
             task = (
                 f"{task}\n\n"
-                f"[CONTEXT: User's current GPS location: lat={gps['lat']}, lon={gps['lon']}, "
-                f"accuracy={gps.get('accuracy', 'unknown')}m. "
+                f"[CONTEXT: User's current GPS location: lat={gps.lat}, lon={gps.lon}, "
+                f"accuracy={gps.accuracy}m. "
                 f"Use this location for any location-related queries.]\n"
                 f"[LANGUAGE: You MUST respond in the SAME language as the question above. "
                 f"Do NOT switch to Czech just because tool data is in Czech.]"
@@ -0,0 +1,144 @@
+"""24 kHz → 16 kHz resampling of Nova Sonic output audio for the browser.
+
+Runs once per streamed audio chunk. With numba installed the polyphase
+filter runs as a compiled loop; otherwise a vectorized NumPy version is used.
+"""
+
+import logging
+
+import numpy as np
+
+try:
+    from numba import njit  # optional: compiled resampling kernel
+except ImportError:
+    njit = None
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_SAMPLE_RATE = 24000
+CLIENT_SAMPLE_RATE = 16000
+
+
+def _polyphase_taps(taps_per_phase: int = 6, cutoff_hz: float = 7500.0) -> np.ndarray:
+    """Windowed-sinc low-pass split into the two phases of a 3:2 decimator.
+
+    Even outputs land on an input sample, odd ones halfway between two, so
+    phase p is the kernel sampled at offsets (k - half + 1) - p/2.
+    """
+    half = taps_per_phase // 2
+    fc = cutoff_hz / OUTPUT_SAMPLE_RATE
+    phases = []
+    for frac in (0.0, 0.5):
+        d = np.arange(taps_per_phase) - (half - 1) - frac
+        h = 2 * fc * np.sinc(2 * fc * d) * np.kaiser(taps_per_phase, 5.0)
+        phases.append(h / h.sum())  # unity DC gain
+    return np.asarray(phases, dtype=np.float32)
+
+
+def _pair_kernel(taps: np.ndarray) -> np.ndarray:
+    """(7, 2) matrix mapping x[3m-2 : 3m+5] to outputs (2m, 2m+1)."""
+    kernel = np.zeros((taps.shape[1] + 1, 2), dtype=np.float32)
+    kernel[:-1, 0] = taps[0]  # output 2m:   centred on x[3m]
+    kernel[1:, 1] = taps[1]   # output 2m+1: centred between x[3m+1] and x[3m+2]
+    return kernel
+
+
+# 24 kHz → 16 kHz is a fixed 3:2 ratio: every 3 input samples yield 2 outputs,
+# each a 6-tap dot product with one of two precomputed phases
+_RESAMPLE_KERNEL = _pair_kernel(_polyphase_taps())
+_KERNEL_SPAN = _RESAMPLE_KERNEL.shape[0]
+
+
+def _resample_numpy(x: np.ndarray, padded: np.ndarray, pair_out: np.ndarray, out: np.ndarray):
+    """Vectorized fallback: one matmul over strided windows, into scratch buffers."""
+    n = len(x)
+    out_len = len(out)
+    pairs = (out_len + 1) // 2
+    # float32 copy with 2 samples of edge padding in front (avoids clicks at
+    # chunk boundaries) and enough behind for the last window
+    padded = padded[:3 * pairs + _KERNEL_SPAN]
+    padded[2:n + 2] = x
+    padded[:2] = x[0]
+    padded[n + 2:] = x[-1]
+    # Overlapping 7-sample windows stepping 3 samples – a view, no copy
+    windows = np.lib.stride_tricks.as_strided(
+        padded, shape=(pairs, _KERNEL_SPAN), strides=(3 * padded.itemsize, padded.itemsize)
+    )
+    # One matmul yields (even, odd) output pairs, already interleaved in order
+    pair_out = pair_out[:pairs]
+    np.matmul(windows, _RESAMPLE_KERNEL, out=pair_out)
+    flat = pair_out.reshape(-1)[:out_len]
+    np.clip(flat, -32768, 32767, out=flat)
+    out[:] = flat  # truncating float → int16 cast
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _tap(x, kernel, base, phase, last):
+        """One output sample; edge windows repeat the first/last sample."""
+        acc = np.float32(0.0)
+        for k in range(kernel.shape[0] - 1):
+            acc += kernel[k + phase, phase] * x[min(max(base + k, 0), last)]
+        return np.int16(min(max(acc, -32768.0), 32767.0))
+
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _resample_3_2(x, kernel, out):
+        """Same filter as _resample_numpy as a compiled loop, with no temporaries."""
+        last = x.shape[0] - 1
+        n_out = out.shape[0]
+        # Output pair m reads x[3m-2 : 3m+5]; pairs 1 .. inner-1 stay in bounds
+        inner = max(min((x.shape[0] - 5) // 3 + 1, n_out // 2), 1)
+        # Taps unpacked to scalars so the inner loop is straight-line FMAs
+        e0, e1, e2, e3, e4, e5 = kernel[0:6, 0]
+        o1, o2, o3, o4, o5, o6 = kernel[1:7, 1]
+        for m in range(1, inner):
+            b = 3 * m - 2
+            even = (e0 * x[b] + e1 * x[b + 1] + e2 * x[b + 2]
+                    + e3 * x[b + 3] + e4 * x[b + 4] + e5 * x[b + 5])
+            odd = (o1 * x[b + 1] + o2 * x[b + 2] + o3 * x[b + 3]
+                   + o4 * x[b + 4] + o5 * x[b + 5] + o6 * x[b + 6])
+            out[2 * m] = np.int16(min(max(even, -32768.0), 32767.0))
+            out[2 * m + 1] = np.int16(min(max(odd, -32768.0), 32767.0))
+        for j in range(n_out):
+            if j < 2 or j >= 2 * inner:
+                out[j] = _tap(x, kernel, 3 * (j >> 1) - 2 + (j & 1), j & 1, last)
+else:
+    _resample_3_2 = None
+
+
+class Resampler:
+    """24 kHz → 16 kHz resampler with scratch buffers reused across chunks.
+
+    One per session; process() returns a view into the output buffer that
+    stays valid until the next call.
+    """
+
+    def __init__(self, max_input_samples: int = 4096):
+        self._reserve(max_input_samples)
+
+    def _reserve(self, n_in: int):
+        pairs = (n_in * CLIENT_SAMPLE_RATE // OUTPUT_SAMPLE_RATE + 1) // 2
+        self._capacity = n_in
+        self._out = np.empty(2 * pairs, dtype=np.int16)
+        if _resample_3_2 is None:
+            self._padded = np.empty(3 * pairs + _KERNEL_SPAN, dtype=np.float32)
+            self._pair_out = np.empty((pairs, 2), dtype=np.float32)
+
+    def process(self, pcm_24k: bytes) -> memoryview:
+        x = np.frombuffer(pcm_24k, dtype=np.int16)
+        if len(x) > self._capacity:
+            self._reserve(len(x))
+        out = self._out[:len(x) * CLIENT_SAMPLE_RATE // OUTPUT_SAMPLE_RATE]
+        if len(out):
+            if _resample_3_2 is None:
+                _resample_numpy(x, self._padded, self._pair_out, out)
+            else:
+                _resample_3_2(x, _RESAMPLE_KERNEL, out)
+        return memoryview(out)
+
+
+def warm_up():
+    """Compile (or load the cached) kernel now, not on the first audio chunk."""
+    if _resample_3_2 is not None:
+        Resampler(32).process(bytes(64))
+        logger.info("🔊 Audio resampler kernel ready")
@@ -11,6 +11,8 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 AWS_SESSION_TOKEN = os.getenv("AWS_SESSION_TOKEN", "")
 AWS_REGION = os.getenv("AWS_REGION", "eu-north-1")
 NOVA_SONIC_MODEL_ID = os.getenv("NOVA_SONIC_MODEL_ID", "amazon.nova-2-sonic-v1:0")
+# Request Bedrock latency-optimized inference (falls back to standard if rejected)
+NOVA_SONIC_LATENCY_OPTIMIZED = os.getenv("NOVA_SONIC_LATENCY_OPTIMIZED", "false").lower() == "true"
 
 # Server
 HOST = os.getenv("HOST", "0.0.0.0")
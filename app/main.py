@@ -1,7 +1,6 @@
 """Sonic2Life - Voice-first life assistant for seniors powered by Amazon Nova 2 Sonic."""
 
 import asyncio
-import json
 import logging
 from fastapi import FastAPI, WebSocket, Request
 from fastapi.staticfiles import StaticFiles
@@ -50,9 +49,11 @@ app.include_router(admin_router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Pre-initialize MCP client and start scheduler."""
+    """Pre-initialize MCP client and audio resampler, start scheduler."""
     import asyncio
+    from app.audio_resample import warm_up as warm_up_resampler
     asyncio.create_task(_warmup_mcp())
+    asyncio.create_task(asyncio.to_thread(warm_up_resampler))
     await start_scheduler()
 
 
@@ -218,9 +219,9 @@ async def push_events(request: Request):
                     break
 
                 try:
-                    # Wait for notification with timeout (keepalive every 30s)
-                    data = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(data)}\n\n"
+                    # Wait for notification with timeout (keepalive every 30s);
+                    # queued items are ready-made SSE frames (see broadcast_to_sse)
+                    yield await asyncio.wait_for(queue.get(), timeout=30.0)
                 except asyncio.TimeoutError:
                     # Send keepalive comment
                     yield ": keepalive\n\n"
@@ -279,4 +280,4 @@ async def push_responses_list():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("app.main:app", host=HOST, port=PORT, reload=True)
+    uvicorn.run("app.main:app", host=HOST, port=PORT, reload=True, loop="uvloop")
@@ -6,13 +6,21 @@ Nova Sonic is fully bidirectional with built-in VAD:
 - Model detects when user stops talking and auto-responds
 - No need for client-side VAD or turn management
 - One audio content block stays open the entire conversation
+
+Runs best on uvloop (uvicorn --loop uvloop, see Dockerfile): the session is
+dominated by many small stream sends/receives over TLS to Bedrock.
 """
 
 import asyncio
+import collections
+import contextlib
 import json
-import base64
+import os
 import uuid
 import logging
+from binascii import a2b_base64, b2a_base64
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from aws_sdk_bedrock_runtime.client import (
     BedrockRuntimeClient,
@@ -30,11 +38,18 @@ from app.config import (
     AWS_SECRET_ACCESS_KEY,
     AWS_SESSION_TOKEN,
     AWS_REGION,
+    DATABASE_PATH,
     NOVA_SONIC_MODEL_ID,
+    NOVA_SONIC_LATENCY_OPTIMIZED,
     NOVA_SONIC_VOICE_ID,
     NOVA_SONIC_SYSTEM_PROMPT,
 )
-from app.tools.database import get_db
+from app.tools.database import close_db, get_db
+
+try:
+    import orjson  # optional: faster event (de)serialization
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +59,259 @@ logging.getLogger("awscrt").setLevel(logging.ERROR)
 import warnings
 warnings.filterwarnings("ignore", message=".*InvalidStateError.*CANCELLED.*")
 
+# Content names for the fixed TEXT blocks sent in start(). Content names only need
+# to be unique within a prompt, and every session gets its own prompt name, so these
+# can be generated once per process.
+_SYSTEM_CONTENT_NAME = uuid.uuid4().hex
+_GREETING_CONTENT_NAME = uuid.uuid4().hex
+
+
+# Window for coalescing assistant text deltas into one transcript_ai message
+TEXT_COALESCE_SECONDS = 0.03
+
+# Max PCM coalesced into one audioInput event when frames back up (100 ms @ 16 kHz s16 mono)
+MAX_AUDIO_BATCH_BYTES = 16000 * 2 // 10
+
+# Queue bounds: mic frames waiting to be sent (drop-oldest) and messages
+# waiting for the client (producer waits, which slows reading from Bedrock)
+AUDIO_QUEUE_MAX_FRAMES = 50
+OUTPUT_QUEUE_MAXSIZE = 200
+
+# Response payloads up to this size are parsed on the event loop without a
+# thread hop (textOutput, contentStart/End, usageEvent, ...)
+INLINE_PARSE_MAX_BYTES = 4096
+
+# Closing part of the audioInput envelope (see start() for the prefix)
+_AUDIO_INPUT_SUFFIX = b'"}}}'
+# Compact audioOutput envelope as sent by Bedrock (fast path in _process_responses)
+_AUDIO_OUTPUT_PREFIX = b'{"event":{"audioOutput"'
+
+# Sentinels spliced with per-session names into the pre-serialized init events
+_PROMPT_NAME_SENTINEL = b"__PROMPT_NAME__"
+_CONTENT_NAME_SENTINEL = b"__CONTENT_NAME__"
+
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(event_data: dict) -> bytes:
+        return json.dumps(event_data).encode("utf-8")
+
+    _loads = json.loads
+
+
+def _audio_output_configuration(voice_id: str) -> dict:
+    return {
+        "mediaType": "audio/lpcm",
+        "sampleRateHertz": 24000,
+        "sampleSizeBits": 16,
+        "channelCount": 1,
+        "voiceId": voice_id,
+        "encoding": "base64",
+        "audioType": "SPEECH",
+    }
+
+
+def _text_content_start(prompt_name: str, content_name: str, role: str) -> dict:
+    return {
+        "event": {
+            "contentStart": {
+                "promptName": prompt_name,
+                "contentName": content_name,
+                "type": "TEXT",
+                "interactive": True,
+                "role": role,
+                "textInputConfiguration": {"mediaType": "text/plain"},
+            }
+        }
+    }
+
+
+def _text_input(prompt_name: str, content_name: str, content: str) -> dict:
+    return {
+        "event": {
+            "textInput": {
+                "promptName": prompt_name,
+                "contentName": content_name,
+                "content": content,
+            }
+        }
+    }
+
+
+def _content_end(prompt_name: str, content_name: str) -> dict:
+    return {"event": {"contentEnd": {"promptName": prompt_name, "contentName": content_name}}}
+
+
+def _text_content_events(prompt_name: str, content_name: str, role: str, content: str) -> list[dict]:
+    """contentStart → textInput → contentEnd for one TEXT content block."""
+    return [
+        _text_content_start(prompt_name, content_name, role),
+        _text_input(prompt_name, content_name, content),
+        _content_end(prompt_name, content_name),
+    ]
+
+
+@lru_cache(maxsize=16)
+def _prebuilt_session_init(voice_id: str) -> tuple[bytes, ...]:
+    """Serialize the fixed session-init events once per voice.
+
+    Returns (sessionStart, promptStart without tools, system contentStart,
+    system contentEnd, greeting contentStart, greeting contentEnd, audio
+    contentStart) with the prompt name / audio content name left as sentinels.
+    """
+    prompt_name = _PROMPT_NAME_SENTINEL.decode()
+
+    return (
+        _dumps({
+            "event": {
+                "sessionStart": {
+                    "inferenceConfiguration": {
+                        "maxTokens": 1024,
+                        "topP": 0.9,
+                        "temperature": 0.7,
+                    }
+                }
+            }
+        }),
+        _dumps({
+            "event": {
+                "promptStart": {
+                    "promptName": prompt_name,
+                    "textOutputConfiguration": {"mediaType": "text/plain"},
+                    "audioOutputConfiguration": _audio_output_configuration(voice_id),
+                    "toolUseOutputConfiguration": {"mediaType": "application/json"},
+                    "toolConfiguration": {"tools": []},
+                }
+            }
+        }),
+        _dumps(_text_content_start(prompt_name, _SYSTEM_CONTENT_NAME, "SYSTEM")),
+        _dumps(_content_end(prompt_name, _SYSTEM_CONTENT_NAME)),
+        _dumps(_text_content_start(prompt_name, _GREETING_CONTENT_NAME, "USER")),
+        _dumps(_content_end(prompt_name, _GREETING_CONTENT_NAME)),
+        _dumps({
+            "event": {
+                "contentStart": {
+                    "promptName": prompt_name,
+                    "contentName": _CONTENT_NAME_SENTINEL.decode(),
+                    "type": "AUDIO",
+                    "interactive": True,
+                    "role": "USER",
+                    "audioInputConfiguration": {
+                        "mediaType": "audio/lpcm",
+                        "sampleRateHertz": 16000,
+                        "sampleSizeBits": 16,
+                        "channelCount": 1,
+                        "audioType": "SPEECH",
+                        "encoding": "base64",
+                    },
+                }
+            }
+        }),
+    )
+
+
+@lru_cache(maxsize=4)
+def _prebuilt_prompt_inputs(system_prompt: str, greeting_prompt: str) -> tuple[bytes, bytes]:
+    """Serialize the system/greeting textInput events once per prompt pair.
+
+    The prompts come from the profile cache, so repeat sessions hit with the
+    same (hash-cached) strings and skip re-encoding the multi-KB system prompt.
+    """
+    prompt_name = _PROMPT_NAME_SENTINEL.decode()
+    return (
+        _dumps(_text_input(prompt_name, _SYSTEM_CONTENT_NAME, system_prompt)),
+        _dumps(_text_input(prompt_name, _GREETING_CONTENT_NAME, greeting_prompt)),
+    )
+
+
+def _audio_output_content(raw: bytes) -> bytes | None:
+    """Slice the base64 content out of a compact audioOutput payload.
+
+    Returns None when the payload doesn't have the expected shape, so the
+    caller can fall back to a full parse.
+    """
+    _, sep, tail = raw.partition(b'"content":"')
+    if not sep:
+        return None
+    b64, sep, _ = tail.partition(b'"')
+    if not sep or b"\\" in b64:
+        return None
+    return b64
+
+
+def _parse_response(raw: bytes, decode_audio: bool = True) -> tuple[dict | None, bytes | None]:
+    """Parse one response payload, decoding audioOutput PCM if decode_audio.
+
+    Runs on the session's parse thread. Returns (None, None) for payloads
+    without an event.
+    """
+    data = _loads(raw)
+    event = data.get("event")
+    if not event:
+        return None, None
+    audio = event.get("audioOutput")
+    if decode_audio and audio and audio.get("content"):
+        return data, a2b_base64(audio["content"])
+    return data, None
+
+
+# Bedrock runtime client shared by all sessions (created on first start())
+_client: BedrockRuntimeClient | None = None
+_client_lock = asyncio.Lock()
+
+
+async def _get_client() -> BedrockRuntimeClient:
+    """Return the shared Bedrock runtime client, creating it once."""
+    global _client
+    async with _client_lock:
+        if _client is None:
+            config = Config(
+                endpoint_uri=f"https://bedrock-runtime.{AWS_REGION}.amazonaws.com",
+                region=AWS_REGION,
+                aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
+            )
+            _client = BedrockRuntimeClient(config=config)
+            logger.info("🔗 Bedrock runtime client created")
+    return _client
+
+
+# Profile + prompts built from it, keyed by the DB files' (mtime, size)
+_PROFILE_CACHE = {"version": None, "profile": None, "system": None, "greeting": None}
+
+
+def _db_version() -> tuple:
+    """Cheap change marker for the SQLite DB (main file + WAL)."""
+    version = []
+    for path in (DATABASE_PATH, DATABASE_PATH + "-wal"):
+        try:
+            st = os.stat(path)
+            version.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+def invalidate_profile_cache():
+    """Drop the cached profile/prompts (call after settings change)."""
+    _PROFILE_CACHE["version"] = None
+
+
+def _load_prompts() -> tuple[dict, str, str]:
+    """Return (profile, system prompt, greeting prompt), cached until the DB changes."""
+    version = _db_version()
+    if _PROFILE_CACHE["version"] is not None and _PROFILE_CACHE["version"] == version:
+        return _PROFILE_CACHE["profile"], _PROFILE_CACHE["system"], _PROFILE_CACHE["greeting"]
+
+    profile = _load_user_profile()
+    system = _build_system_prompt(profile)
+    greeting = _build_greeting_prompt(profile)
+    if profile:
+        # Don't cache a failed load
+        _PROFILE_CACHE.update(version=version, profile=profile, system=system, greeting=greeting)
+    return profile, system, greeting
+
 
 def _load_user_profile() -> dict:
     """Load user profile settings from SQLite for prompt personalization."""
@@ -55,13 +323,71 @@ def _load_user_profile() -> dict:
                 "SELECT value FROM settings WHERE key = ?", (key,)
             ).fetchone()
             profile[key] = row["value"] if row and row["value"] else ""
-        conn.close()
+        close_db(conn)
         return profile
     except Exception as e:
         logger.warning(f"⚠️ Could not load user profile: {e}")
         return {}
 
 
+# Default system prompt around the per-user block (see _build_system_prompt)
+_SYS_PREFIX = (
+    # Language rule
+    "CRITICAL LANGUAGE RULE: You MUST detect the language the user speaks and ALWAYS reply "
+    "in THAT SAME language. If the user speaks English, reply in English. "
+    "If Czech, reply in Czech. If German, reply in German. "
+    "NEVER default to any particular language – always match the user's language "
+    "from their very first word. "
+    # Identity
+    "You are Sonic2Life – a kind, patient voice assistant for seniors living independently. "
+)
+_SYS_SUFFIX = (
+    # Personality
+    "Your traits: "
+    "- Speak SLOWLY, CLEARLY and in an EASY-TO-UNDERSTAND way. "
+    "- Use short sentences (max 2-3 at a time). "
+    "- Be warm, empathetic and patient – like a good grandchild. "
+    "- Never rush. If the user does not understand, rephrase. "
+    "- Address the user politely (formal 'you'). "
+    # Tools
+    "- You have access to the askAgent tool – a powerful assistant that can: "
+    "  search the web, find location and nearby places (has access to the user's GPS), "
+    "  check weather and forecast, manage medications, remember user preferences, "
+    "  manage calendar events and appointments, manage emergency contacts, "
+    "  SEND SMS/TEXT MESSAGES to contacts, analyze photos, "
+    "  calculate, check date/time, make HTTP requests and solve complex problems. "
+    "- You MUST use askAgent for: "
+    "  * Location questions ('where am I', 'what is nearby', 'find the nearest...') "
+    "  * Weather questions ('what is the weather', 'will it rain tomorrow') "
+    "  * Medication management ('what meds do I have', 'add a medication', 'I took my pill') "
+    "  * Calendar/events ('schedule a doctor appointment', 'what is my schedule today', "
+    "    'when is my next appointment', 'cancel the dentist', 'reschedule to Friday') "
+    "  * Today's schedule ('what do I have today', 'what is planned for today') "
+    "  * Memory ('remember that I like...', 'what do you know about me') "
+    "  * Emergency contacts ('who are my contacts', 'add my son as contact') "
+    "  * Sending messages ('text my son', 'send SMS to...', 'message my daughter') "
+    "  * Any question that needs facts, real-time information or calculations "
+    "- When you need to use askAgent, just call it directly without announcing it first. "
+    "  DO NOT ask clarifying questions if askAgent can figure it out. For example: "
+    "  if the user says 'text my son', call askAgent immediately – it will look up the son "
+    "  in emergency contacts and send the SMS. Do not ask for the phone number or name. "
+    "  The user interface will show a visual indicator that you are working. "
+    "  After getting the result, speak the answer naturally in the SAME LANGUAGE the user is speaking. "
+    "  IMPORTANT: Even if the tool returns data in a different language, YOU must always "
+    "  respond in the language the user used in their last message. "
+    # Health
+    "- If the user says they feel unwell or have a health problem, "
+    "  ask for details and offer to contact a close person or emergency services. "
+)
+
+_GREETING_PROMPT = (
+    "[SYSTEM: The user just connected. Greet them warmly and ask "
+    "how you can help today. Say something like 'Hello! How can I "
+    "help you today?' Keep it short and friendly. Remember to match "
+    "the user's language once they start speaking.]"
+)
+
+
 def _build_system_prompt(profile: dict) -> str:
     """Build the Nova Sonic system prompt with user personalization."""
     # Allow full override from admin settings
@@ -69,7 +395,6 @@ def _build_system_prompt(profile: dict) -> str:
         return profile["system_prompt"]
 
     # Allow env var override
-    import os
     env_prompt = os.getenv("NOVA_SONIC_SYSTEM_PROMPT", "")
     if env_prompt:
         return env_prompt
@@ -89,54 +414,7 @@ def _build_system_prompt(profile: dict) -> str:
             f"and important moments. Do NOT use their name in every sentence. "
         )
 
-    return (
-        # Language rule
-        "CRITICAL LANGUAGE RULE: You MUST detect the language the user speaks and ALWAYS reply "
-        "in THAT SAME language. If the user speaks English, reply in English. "
-        "If Czech, reply in Czech. If German, reply in German. "
-        "NEVER default to any particular language – always match the user's language "
-        "from their very first word. "
-        # Identity
-        "You are Sonic2Life – a kind, patient voice assistant for seniors living independently. "
-        # User profile
-        + user_block +
-        # Personality
-        "Your traits: "
-        "- Speak SLOWLY, CLEARLY and in an EASY-TO-UNDERSTAND way. "
-        "- Use short sentences (max 2-3 at a time). "
-        "- Be warm, empathetic and patient – like a good grandchild. "
-        "- Never rush. If the user does not understand, rephrase. "
-        "- Address the user politely (formal 'you'). "
-        # Tools
-        "- You have access to the askAgent tool – a powerful assistant that can: "
-        "  search the web, find location and nearby places (has access to the user's GPS), "
-        "  check weather and forecast, manage medications, remember user preferences, "
-        "  manage calendar events and appointments, manage emergency contacts, "
-        "  SEND SMS/TEXT MESSAGES to contacts, analyze photos, "
-        "  calculate, check date/time, make HTTP requests and solve complex problems. "
-        "- You MUST use askAgent for: "
-        "  * Location questions ('where am I', 'what is nearby', 'find the nearest...') "
-        "  * Weather questions ('what is the weather', 'will it rain tomorrow') "
-        "  * Medication management ('what meds do I have', 'add a medication', 'I took my pill') "
-        "  * Calendar/events ('schedule a doctor appointment', 'what is my schedule today', "
-        "    'when is my next appointment', 'cancel the dentist', 'reschedule to Friday') "
-        "  * Today's schedule ('what do I have today', 'what is planned for today') "
-        "  * Memory ('remember that I like...', 'what do you know about me') "
-        "  * Emergency contacts ('who are my contacts', 'add my son as contact') "
-        "  * Sending messages ('text my son', 'send SMS to...', 'message my daughter') "
-        "  * Any question that needs facts, real-time information or calculations "
-        "- When you need to use askAgent, just call it directly without announcing it first. "
-        "  DO NOT ask clarifying questions if askAgent can figure it out. For example: "
-        "  if the user says 'text my son', call askAgent immediately – it will look up the son "
-        "  in emergency contacts and send the SMS. Do not ask for the phone number or name. "
-        "  The user interface will show a visual indicator that you are working. "
-        "  After getting the result, speak the answer naturally in the SAME LANGUAGE the user is speaking. "
-        "  IMPORTANT: Even if the tool returns data in a different language, YOU must always "
-        "  respond in the language the user used in their last message. "
-        # Health
-        "- If the user says they feel unwell or have a health problem, "
-        "  ask for details and offer to contact a close person or emergency services. "
-    )
+    return _SYS_PREFIX + user_block + _SYS_SUFFIX
 
 
 def _build_greeting_prompt(profile: dict) -> str:
@@ -149,12 +427,7 @@ def _build_greeting_prompt(profile: dict) -> str:
             f"Keep it short and friendly. Remember to match "
             f"the user's language once they start speaking.]"
         )
-    return (
-        "[SYSTEM: The user just connected. Greet them warmly and ask "
-        "how you can help today. Say something like 'Hello! How can I "
-        "help you today?' Keep it short and friendly. Remember to match "
-        "the user's language once they start speaking.]"
-    )
+    return _GREETING_PROMPT
 
 
 class NovaSonicSession:
@@ -162,37 +435,73 @@ class NovaSonicSession:
     Manages one bidirectional streaming session with Nova 2 Sonic.
 
     Simple lifecycle (matching official AWS sample):
+        0. create()      – build the session without blocking the event loop
         1. start()       – open stream, init session, open audio content block
         2. send_audio()  – continuously feed PCM audio (model auto-detects speech/silence)
         3. close()       – tear down everything
     """
 
-    def __init__(self, tool_specs=None, tool_handler=None, voice_id=None):
+    def __init__(self, tool_specs=None, tool_handler=None, voice_id=None, audio_b64=False, prompts=None):
         self.tool_specs = tool_specs or []
         self.tool_handler = tool_handler
         self.voice_id = voice_id or NOVA_SONIC_VOICE_ID
+        # Consumers that can take base64 audio directly get {"type": "audio_b64"}
+        # messages and skip the decode; default is decoded PCM ({"type": "audio"})
+        self.audio_b64 = audio_b64
 
-        # Load user profile and build personalized prompts
-        self._user_profile = _load_user_profile()
-        self._system_prompt = _build_system_prompt(self._user_profile)
-        self._greeting_prompt = _build_greeting_prompt(self._user_profile)
+        # Load user profile and build personalized prompts (create() loads them off the loop)
+        self._user_profile, self._system_prompt, self._greeting_prompt = prompts or _load_prompts()
         logger.info(f"👤 User profile loaded: {self._user_profile.get('user_name', '(not set)')}")
 
         self._stream = None
         self._client = None
         self._is_active = False
 
-        self._prompt_name = str(uuid.uuid4())
-        self._audio_content_name = str(uuid.uuid4())
+        self._prompt_name = uuid.uuid4().hex
+        self._audio_content_name = uuid.uuid4().hex
+        # ASCII bytes forms, spliced into the pre-serialized payloads
+        self._prompt_name_b = self._prompt_name.encode("ascii")
+        self._audio_content_name_b = self._audio_content_name.encode("ascii")
 
-        self.output_queue: asyncio.Queue = asyncio.Queue()
+        self.output_queue: asyncio.Queue = asyncio.Queue(maxsize=OUTPUT_QUEUE_MAXSIZE)
         self._response_task = None
-        self._audio_queue: asyncio.Queue = asyncio.Queue()
+        # Bounded: if sending stalls, the oldest mic frames are dropped
+        self._audio_deque: collections.deque[bytes] = collections.deque(maxlen=AUDIO_QUEUE_MAX_FRAMES)
+        self._audio_event = asyncio.Event()
         self._audio_sender_task = None
+        self._parse_pool = None
+        self._teardown_events = ()
+        self._greeting_events = ()
+        self._audio_input_prefix = b""
+
+        # Pending assistant text deltas, flushed as one transcript_ai message
+        self._text_buf: list[str] = []
+        self._text_flush_handle = None
+        self._text_flush_task = None
+
+        self._pending_tool = None
+        self._handlers = {
+            "textOutput": self._on_text_output,
+            "contentStart": self._on_content_start,
+            "toolUse": self._on_tool_use,
+            "contentEnd": self._on_content_end,
+            "usageEvent": self._on_usage_event,
+            "completionStart": self._on_completion_start,
+            "completionEnd": self._on_completion_end,
+        }
 
         # Track content generation stage to avoid duplicate text
         self._current_generation_stage = None  # "SPECULATIVE" or "FINAL"
         self._current_role = None
+        # Last raw additionalModelFields string and the stage parsed from it
+        self._last_additional_raw = None
+        self._last_generation_stage = "FINAL"
+
+    @classmethod
+    async def create(cls, tool_specs=None, tool_handler=None, voice_id=None, audio_b64=False):
+        """Build a session, reading the user profile from SQLite in a worker thread."""
+        prompts = await asyncio.to_thread(_load_prompts)
+        return cls(tool_specs, tool_handler, voice_id, audio_b64, prompts=prompts)
 
     @property
     def is_active(self):
@@ -203,7 +512,6 @@ class NovaSonicSession:
         logger.info(f"🚀 Starting Nova 2 Sonic session (voice={self.voice_id})...")
 
         # Set credentials into env vars for EnvironmentCredentialsResolver
-        import os
         if not AWS_ACCESS_KEY_ID or not AWS_SECRET_ACCESS_KEY:
             raise RuntimeError(
                 "AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY must be set in .env or environment"
@@ -219,190 +527,116 @@ class NovaSonicSession:
             os.environ.pop("AWS_SESSION_TOKEN", None)
             logger.info("✅ AWS credentials loaded (permanent keys, no session token)")
 
-        config = Config(
-            endpoint_uri=f"https://bedrock-runtime.{AWS_REGION}.amazonaws.com",
-            region=AWS_REGION,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
-        )
-        self._client = BedrockRuntimeClient(config=config)
+        self._client = await _get_client()
 
-        self._stream = await self._client.invoke_model_with_bidirectional_stream(
-            InvokeModelWithBidirectionalStreamOperationInput(model_id=NOVA_SONIC_MODEL_ID)
-        )
+        self._stream = await self._open_stream()
         self._is_active = True
 
+        # audioInput envelope around the base64 payload, built once per session
+        self._audio_input_prefix = (
+            b'{"event": {"audioInput": {"promptName": "' + self._prompt_name_b
+            + b'", "contentName": "' + self._audio_content_name_b
+            + b'", "content": "'
+        )
+
+        # Single worker keeps responses parsed in arrival order
+        self._parse_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nova-parse")
+
         # Start response listener
         self._response_task = asyncio.create_task(self._process_responses())
         # Start audio sender
         self._audio_sender_task = asyncio.create_task(self._process_audio_queue())
 
-        # Session start
-        await self._send_event({
-            "event": {
-                "sessionStart": {
-                    "inferenceConfiguration": {
-                        "maxTokens": 1024,
-                        "topP": 0.9,
-                        "temperature": 0.7,
-                    }
-                }
-            }
-        })
+        # Fixed init events are pre-serialized once per voice; only the
+        # per-session names are spliced in.
+        prompt_name = self._prompt_name_b
+        session_start, prompt_start_no_tools, system_start, system_end, \
+            greeting_start, greeting_end, audio_start = (
+                p.replace(_PROMPT_NAME_SENTINEL, prompt_name)
+                for p in _prebuilt_session_init(self.voice_id)
+            )
+        audio_start = audio_start.replace(
+            _CONTENT_NAME_SENTINEL, self._audio_content_name_b
+        )
+        system_input, greeting_input = (
+            p.replace(_PROMPT_NAME_SENTINEL, prompt_name)
+            for p in _prebuilt_prompt_inputs(self._system_prompt, self._greeting_prompt)
+        )
 
-        # Prompt start
-        prompt_start = {
-            "event": {
-                "promptStart": {
-                    "promptName": self._prompt_name,
-                    "textOutputConfiguration": {"mediaType": "text/plain"},
-                    "audioOutputConfiguration": {
-                        "mediaType": "audio/lpcm",
-                        "sampleRateHertz": 24000,
-                        "sampleSizeBits": 16,
-                        "channelCount": 1,
-                        "voiceId": self.voice_id,
-                        "encoding": "base64",
-                        "audioType": "SPEECH",
-                    },
-                    "toolUseOutputConfiguration": {"mediaType": "application/json"},
-                }
-            }
-        }
+        # Session start + prompt start
         if self.tool_specs:
-            prompt_start["event"]["promptStart"]["toolConfiguration"] = {"tools": self.tool_specs}
-        else:
-            prompt_start["event"]["promptStart"]["toolConfiguration"] = {"tools": []}
-        await self._send_event(prompt_start)
-
-        # System prompt
-        system_content = str(uuid.uuid4())
-        await self._send_event({
-            "event": {
-                "contentStart": {
-                    "promptName": self._prompt_name,
-                    "contentName": system_content,
-                    "type": "TEXT",
-                    "interactive": True,
-                    "role": "SYSTEM",
-                    "textInputConfiguration": {"mediaType": "text/plain"},
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "textInput": {
-                    "promptName": self._prompt_name,
-                    "contentName": system_content,
-                    "content": self._system_prompt,
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "contentEnd": {
-                    "promptName": self._prompt_name,
-                    "contentName": system_content,
+            prompt_start = _dumps({
+                "event": {
+                    "promptStart": {
+                        "promptName": self._prompt_name,
+                        "textOutputConfiguration": {"mediaType": "text/plain"},
+                        "audioOutputConfiguration": _audio_output_configuration(self.voice_id),
+                        "toolUseOutputConfiguration": {"mediaType": "application/json"},
+                        "toolConfiguration": {"tools": self.tool_specs},
+                    }
                 }
-            }
-        })
+            })
+        else:
+            prompt_start = prompt_start_no_tools
 
-        # Send greeting text prompt BEFORE opening audio block
+        # System prompt + greeting text prompt, dispatched as one batch.
+        # Greeting is sent BEFORE opening the audio block
         # (must be sent first so model speaks before waiting for audio)
-        greeting_content = str(uuid.uuid4())
-        await self._send_event({
-            "event": {
-                "contentStart": {
-                    "promptName": self._prompt_name,
-                    "contentName": greeting_content,
-                    "type": "TEXT",
-                    "interactive": True,
-                    "role": "USER",
-                    "textInputConfiguration": {"mediaType": "text/plain"},
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "textInput": {
-                    "promptName": self._prompt_name,
-                    "contentName": greeting_content,
-                    "content": self._greeting_prompt,
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "contentEnd": {
-                    "promptName": self._prompt_name,
-                    "contentName": greeting_content,
-                }
-            }
-        })
+        await self._send_payloads([
+            session_start,
+            prompt_start,
+            system_start,
+            system_input,
+            system_end,
+            greeting_start,
+            greeting_input,
+            greeting_end,
+        ])
         logger.info("👋 Greeting prompt sent – model will speak first")
 
         # Open audio content block – stays open the ENTIRE conversation
         # (opened AFTER greeting so they don't conflict)
-        await self._send_event({
-            "event": {
-                "contentStart": {
-                    "promptName": self._prompt_name,
-                    "contentName": self._audio_content_name,
-                    "type": "AUDIO",
-                    "interactive": True,
-                    "role": "USER",
-                    "audioInputConfiguration": {
-                        "mediaType": "audio/lpcm",
-                        "sampleRateHertz": 16000,
-                        "sampleSizeBits": 16,
-                        "channelCount": 1,
-                        "audioType": "SPEECH",
-                        "encoding": "base64",
-                    },
-                }
-            }
-        })
+        await self._send_payloads([audio_start])
+
+        # Re-greeting block for send_greeting_prompt(), serialized once; each
+        # send splices in a fresh content name (must be unique within the prompt)
+        self._greeting_events = [
+            _dumps(e) for e in _text_content_events(
+                self._prompt_name, _CONTENT_NAME_SENTINEL.decode(), "USER", self._greeting_prompt
+            )
+        ]
+        self._teardown_events = (
+            _dumps(_content_end(self._prompt_name, self._audio_content_name)),
+            _dumps({"event": {"promptEnd": {"promptName": self._prompt_name}}}),
+            _dumps({"event": {"sessionEnd": {}}}),
+        )
 
         logger.info("✅ Session ready – streaming audio continuously")
 
+    async def _open_stream(self):
+        """Open the bidirectional stream, latency-optimized if configured."""
+        if NOVA_SONIC_LATENCY_OPTIMIZED:
+            try:
+                return await self._client.invoke_model_with_bidirectional_stream(
+                    InvokeModelWithBidirectionalStreamOperationInput(
+                        model_id=NOVA_SONIC_MODEL_ID,
+                        performance_config_latency="optimized",
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Latency-optimized inference not available, using standard: {e}")
+        return await self._client.invoke_model_with_bidirectional_stream(
+            InvokeModelWithBidirectionalStreamOperationInput(model_id=NOVA_SONIC_MODEL_ID)
+        )
+
     async def send_greeting_prompt(self):
         """Send a hidden text prompt to make the model greet the user first."""
         if not self._is_active:
             return
-        greeting_content = str(uuid.uuid4())
-        await self._send_event({
-            "event": {
-                "contentStart": {
-                    "promptName": self._prompt_name,
-                    "contentName": greeting_content,
-                    "type": "TEXT",
-                    "interactive": True,
-                    "role": "USER",
-                    "textInputConfiguration": {"mediaType": "text/plain"},
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "textInput": {
-                    "promptName": self._prompt_name,
-                    "contentName": greeting_content,
-                    "content": (
-                        "[SYSTEM: The user just connected. Greet them warmly and ask "
-                        "how you can help today. Say something like 'Hello! How can I "
-                        "help you today?' Keep it short and friendly. Remember to match "
-                        "the user's language once they start speaking.]"
-                    ),
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "contentEnd": {
-                    "promptName": self._prompt_name,
-                    "contentName": greeting_content,
-                }
-            }
-        })
+        content_name = uuid.uuid4().hex.encode()
+        await self._send_payloads([
+            p.replace(_CONTENT_NAME_SENTINEL, content_name) for p in self._greeting_events
+        ])
         logger.info("👋 Greeting prompt sent – model will speak first")
 
     async def send_photo_context(self, description: str):
@@ -414,84 +648,68 @@ class NovaSonicSession:
             logger.warning("📸 Cannot inject photo context – session not active")
             return
 
-        photo_content = str(uuid.uuid4())
-        await self._send_event({
-            "event": {
-                "contentStart": {
-                    "promptName": self._prompt_name,
-                    "contentName": photo_content,
-                    "type": "TEXT",
-                    "interactive": True,
-                    "role": "USER",
-                    "textInputConfiguration": {"mediaType": "text/plain"},
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "textInput": {
-                    "promptName": self._prompt_name,
-                    "contentName": photo_content,
-                    "content": (
-                        f"[SYSTEM: The user just took a photo with their camera. "
-                        f"Here is what the photo shows:\n\n{description}\n\n"
-                        f"Tell the user what you see in the photo in a friendly, clear way. "
-                        f"Keep it concise (2-3 sentences). If you see text, read it out. "
-                        f"If you see medication, identify it. Ask if they want to know more.]"
-                    ),
-                }
-            }
-        })
-        await self._send_event({
-            "event": {
-                "contentEnd": {
-                    "promptName": self._prompt_name,
-                    "contentName": photo_content,
-                }
-            }
-        })
+        await self._send_events(_text_content_events(
+            self._prompt_name,
+            uuid.uuid4().hex,
+            "USER",
+            (
+                f"[SYSTEM: The user just took a photo with their camera. "
+                f"Here is what the photo shows:\n\n{description}\n\n"
+                f"Tell the user what you see in the photo in a friendly, clear way. "
+                f"Keep it concise (2-3 sentences). If you see text, read it out. "
+                f"If you see medication, identify it. Ask if they want to know more.]"
+            ),
+        ))
         logger.info("📸 Photo context injected – model will describe the photo")
 
     async def send_audio(self, pcm_bytes: bytes):
         """Queue a PCM audio chunk for sending."""
         if not self._is_active:
             return
-        b64 = base64.b64encode(pcm_bytes).decode("utf-8")
-        await self._audio_queue.put(b64)
+        self._audio_deque.append(pcm_bytes)
+        self._audio_event.set()
 
     async def close(self):
         """Tear down the session. Safe to call multiple times."""
         was_active = self._is_active
         self._is_active = False
+        self._audio_event.set()
 
         if was_active:
             logger.info("🔚 Closing session...")
-            # Close audio content, prompt, session
-            try:
-                await self._send_event({"event": {"contentEnd": {"promptName": self._prompt_name, "contentName": self._audio_content_name}}})
-                await self._send_event({"event": {"promptEnd": {"promptName": self._prompt_name}}})
-                await self._send_event({"event": {"sessionEnd": {}}})
-            except Exception:
-                pass
+            # Close audio content, prompt, session (pre-serialized in start();
+            # sent directly since _send_event is a no-op once inactive)
+            if self._stream and self._teardown_events:
+                with contextlib.suppress(Exception):
+                    for payload in self._teardown_events:
+                        await self._stream.input_stream.send(
+                            InvokeModelWithBidirectionalStreamInputChunk(
+                                value=BidirectionalInputPayloadPart(bytes_=payload)
+                            )
+                        )
 
         if self._stream:
-            try:
+            with contextlib.suppress(Exception):
                 await self._stream.input_stream.close()
-            except Exception:
-                pass
             self._stream = None
 
-        for task in [self._response_task, self._audio_sender_task]:
-            if task and not task.done():
-                task.cancel()
-                try:
-                    await task
-                except (asyncio.CancelledError, Exception):
-                    pass
+        # Cancel both loops and wait for them together
+        tasks = [
+            t for t in (self._response_task, self._audio_sender_task, self._text_flush_task)
+            if t and not t.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         self._response_task = None
         self._audio_sender_task = None
 
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=False)
+            self._parse_pool = None
+
         if was_active:
             logger.info("✅ Session closed")
 
@@ -501,126 +719,135 @@ class NovaSonicSession:
         if not self._stream or not self._is_active:
             return
         chunk = InvokeModelWithBidirectionalStreamInputChunk(
-            value=BidirectionalInputPayloadPart(bytes_=json.dumps(event_data).encode("utf-8"))
+            value=BidirectionalInputPayloadPart(bytes_=_dumps(event_data))
         )
         await self._stream.input_stream.send(chunk)
 
+    async def _send_events(self, events: list[dict]):
+        """Serialize several events up front and send them back-to-back."""
+        await self._send_payloads([_dumps(e) for e in events])
+
+    async def _send_payloads(self, payloads: list[bytes]):
+        """Send pre-serialized event payloads in order.
+
+        Sent sequentially rather than with gather(): the model requires
+        contentStart → textInput → contentEnd to arrive in order.
+        """
+        if not self._stream or not self._is_active:
+            return
+        send = self._stream.input_stream.send
+        for payload in payloads:
+            await send(InvokeModelWithBidirectionalStreamInputChunk(
+                value=BidirectionalInputPayloadPart(bytes_=payload)
+            ))
+
     async def _process_audio_queue(self):
-        while self._is_active:
-            try:
-                b64 = await asyncio.wait_for(self._audio_queue.get(), timeout=1.0)
-                if self._is_active:
-                    await self._send_event({
-                        "event": {
-                            "audioInput": {
-                                "promptName": self._prompt_name,
-                                "contentName": self._audio_content_name,
-                                "content": b64,
-                            }
-                        }
-                    })
-            except asyncio.TimeoutError:
-                continue
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Audio send error: {e}")
+        # Single producer / single consumer on one loop: a deque plus an
+        # Event avoids asyncio.Queue's per-item Future machinery. Shutdown
+        # also sets the event to wake this loop.
+        audio = self._audio_deque
+        wakeup = self._audio_event
+        # The SDK serializes the event inside send(), so this strictly
+        # sequential sender can reuse one wrapper pair for every frame.
+        chunk = InvokeModelWithBidirectionalStreamInputChunk(
+            value=BidirectionalInputPayloadPart(bytes_=b"")
+        )
+        try:
+            while self._is_active:
+                if not audio:
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                if not self._stream:
+                    break
+                pcm = audio.popleft()
+                # Coalesce any backlog into one event (capped to keep latency low)
+                if audio:
+                    frames = [pcm]
+                    total = len(pcm)
+                    while audio and total < MAX_AUDIO_BATCH_BYTES:
+                        frame = audio.popleft()
+                        frames.append(frame)
+                        total += len(frame)
+                    pcm = b"".join(frames)
+                try:
+                    # Splice the base64 audio into the pre-built envelope
+                    # instead of json.dumps-ing a dict per frame
+                    chunk.value.bytes_ = (
+                        self._audio_input_prefix
+                        + b2a_base64(pcm, newline=False)
+                        + _AUDIO_INPUT_SUFFIX
+                    )
+                    await self._stream.input_stream.send(chunk)
+                except Exception as e:
+                    logger.error(f"Audio send error: {e}")
+        except asyncio.CancelledError:
+            pass
 
     async def _process_responses(self):
         logger.info("🎧 Listening for responses...")
         _resp_count = 0
+        loop = asyncio.get_running_loop()
+        # await_output() resolves once per stream; keep the receiving half
+        # instead of re-awaiting it for every event.
+        output_stream = None
 
         while self._is_active:
             try:
-                output = await asyncio.wait_for(self._stream.await_output(), timeout=60.0)
-                result = await output[1].receive()
+                if output_stream is None:
+                    _, output_stream = await asyncio.wait_for(self._stream.await_output(), timeout=60.0)
+                result = await output_stream.receive()
 
                 _resp_count += 1
                 if not (result.value and result.value.bytes_):
-                    logger.debug(f"📥 Empty response #{_resp_count} (value={result.value})")
+                    logger.debug("📥 Empty response #%d (value=%s)", _resp_count, result.value)
                     continue
 
-                logger.info(f"📥 Response #{_resp_count}: {len(result.value.bytes_)} bytes")
-
-                data = json.loads(result.value.bytes_.decode("utf-8"))
-                if "event" not in data:
+                raw = result.value.bytes_
+                logger.debug("📥 Response #%d: %d bytes", _resp_count, len(raw))
+
+                # Audio output → forward (hot path): slice the base64 out of
+                # the envelope instead of building the full event dict
+                if raw.startswith(_AUDIO_OUTPUT_PREFIX):
+                    b64 = _audio_output_content(raw)
+                    if b64 is not None:
+                        if not b64:
+                            continue
+                        if self.audio_b64:
+                            await self.output_queue.put({"type": "audio_b64", "data": b64.decode("ascii")})
+                        else:
+                            pcm = await loop.run_in_executor(self._parse_pool, a2b_base64, b64)
+                            await self.output_queue.put({"type": "audio", "data": pcm})
+                        continue
+
+                # Small control events are parsed inline; anything large (audio
+                # that missed the fast path) goes to the parse thread so bursts
+                # don't stall the event loop
+                if len(raw) <= INLINE_PARSE_MAX_BYTES:
+                    data, pcm = _parse_response(raw, not self.audio_b64)
+                else:
+                    data, pcm = await loop.run_in_executor(
+                        self._parse_pool, _parse_response, raw, not self.audio_b64
+                    )
+                if data is None:
                     continue
 
-                event_name = list(data["event"].keys())[0]
+                event_name, payload = next(iter(data["event"].items()))
 
-                # Audio output → forward
+                # Audio output that didn't match the compact fast path
                 if event_name == "audioOutput":
-                    audio_b64 = data["event"]["audioOutput"].get("content", "")
-                    if audio_b64:
-                        pcm = base64.b64decode(audio_b64)
+                    if self.audio_b64:
+                        if payload.get("content"):
+                            await self.output_queue.put({"type": "audio_b64", "data": payload["content"]})
+                    elif pcm:
                         await self.output_queue.put({"type": "audio", "data": pcm})
+                    continue
 
-                # Text output – only show SPECULATIVE text (FINAL is a duplicate)
-                elif event_name == "textOutput":
-                    text = data["event"]["textOutput"].get("content", "")
-                    role = data["event"]["textOutput"].get("role", "ASSISTANT")
-                    if text:
-                        # Check for barge-in signal
-                        if '{ "interrupted" : true }' in text:
-                            logger.info("⚡ Barge-in detected")
-                            await self.output_queue.put({"type": "barge_in"})
-                        elif role == "USER":
-                            # User transcripts from FINAL stage only (more accurate)
-                            if self._current_generation_stage == "FINAL":
-                                await self.output_queue.put({"type": "transcript_user", "text": text})
-                        elif role == "ASSISTANT":
-                            # Assistant text from SPECULATIVE only (FINAL is duplicate)
-                            if self._current_generation_stage == "SPECULATIVE":
-                                await self.output_queue.put({"type": "transcript_ai", "text": text})
-
-                # Content start – track generation stage
-                elif event_name == "contentStart":
-                    cs = data["event"]["contentStart"]
-                    content_type = cs.get("type", "")
-                    self._current_role = cs.get("role", "")
-
-                    # Parse generation stage (SPECULATIVE = streaming preview, FINAL = confirmed)
-                    additional = cs.get("additionalModelFields", "")
-                    if additional:
-                        try:
-                            fields = json.loads(additional) if isinstance(additional, str) else additional
-                            self._current_generation_stage = fields.get("generationStage", "FINAL")
-                        except (json.JSONDecodeError, AttributeError):
-                            self._current_generation_stage = "FINAL"
-                    else:
-                        self._current_generation_stage = "FINAL"
-
-                    if content_type == "AUDIO" and self._current_role == "ASSISTANT":
-                        await self.output_queue.put({"type": "speaking"})
-                    elif content_type == "TEXT" and self._current_role == "ASSISTANT":
-                        # Only notify "thinking" for SPECULATIVE (avoid double)
-                        if self._current_generation_stage == "SPECULATIVE":
-                            await self.output_queue.put({"type": "thinking"})
-
-                # Tool use
-                elif event_name == "toolUse":
-                    tool_name = data["event"]["toolUse"].get("toolName", "")
-                    tool_use_id = data["event"]["toolUse"].get("toolUseId", "")
-                    tool_content = data["event"]["toolUse"].get("content", "")
-                    await self.output_queue.put({"type": "tool_use", "tool": tool_name})
-                    self._pending_tool = {"name": tool_name, "id": tool_use_id, "content": tool_content}
-
-                # Content end
-                elif event_name == "contentEnd":
-                    ct = data["event"]["contentEnd"].get("type", "")
-                    if ct == "TOOL" and hasattr(self, "_pending_tool") and self._pending_tool:
-                        await self._handle_tool_result(data["event"]["contentEnd"].get("promptName", self._prompt_name))
-
-                # Usage events - ignore
-                elif event_name == "usageEvent":
-                    pass
-
-                # Completion events - ignore (model manages turns internally)
-                elif event_name in ("completionStart", "completionEnd"):
-                    logger.info(f"📥 {event_name}")
-
+                handler = self._handlers.get(event_name)
+                if handler:
+                    await handler(payload)
                 else:
-                    logger.info(f"📥 Unknown event: {event_name}")
+                    logger.debug("📥 Unknown event: %s", event_name)
 
             except asyncio.TimeoutError:
                 continue
@@ -634,7 +861,127 @@ class NovaSonicSession:
                 break
 
         self._is_active = False
-        await self.output_queue.put({"type": "done"})
+        self._audio_event.set()
+        # Never await here: on close() the forwarder is already gone, and a
+        # blocking put on a full queue would hang the cancelled task forever
+        text = self._take_text()
+        if text:
+            self._put_final({"type": "transcript_ai", "text": text})
+        self._put_final({"type": "done"})
+
+    def _put_final(self, msg: dict):
+        """Queue a closing message without waiting, evicting the oldest if full."""
+        try:
+            self.output_queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            self.output_queue.get_nowait()
+            self.output_queue.put_nowait(msg)
+
+    # ── Response event handlers (dispatched by event name) ────────
+
+    async def _on_text_output(self, event: dict):
+        # Text output – only show SPECULATIVE text (FINAL is a duplicate)
+        text = event.get("content", "")
+        role = event.get("role", "ASSISTANT")
+        if not text:
+            return
+        # Check for barge-in signal
+        if '{ "interrupted" : true }' in text:
+            logger.info("⚡ Barge-in detected")
+            await self._flush_text()
+            await self.output_queue.put({"type": "barge_in"})
+        elif role == "USER":
+            # User transcripts from FINAL stage only (more accurate)
+            if self._current_generation_stage == "FINAL":
+                await self._flush_text()
+                await self.output_queue.put({"type": "transcript_user", "text": text})
+        elif role == "ASSISTANT":
+            # Assistant text from SPECULATIVE only (FINAL is duplicate);
+            # deltas are coalesced for a short window before emitting
+            if self._current_generation_stage == "SPECULATIVE":
+                self._text_buf.append(text)
+                if self._text_flush_handle is None:
+                    self._text_flush_handle = asyncio.get_running_loop().call_later(
+                        TEXT_COALESCE_SECONDS, self._start_text_flush
+                    )
+
+    async def _on_content_start(self, cs: dict):
+        # Content start – track generation stage
+        await self._flush_text()
+        content_type = cs.get("type", "")
+        self._current_role = cs.get("role", "")
+
+        # Parse generation stage (SPECULATIVE = streaming preview, FINAL = confirmed)
+        additional = cs.get("additionalModelFields", "")
+        if not additional:
+            self._current_generation_stage = "FINAL"
+        elif additional == self._last_additional_raw:
+            # Consecutive contentStarts usually repeat the same fields
+            self._current_generation_stage = self._last_generation_stage
+        else:
+            try:
+                fields = _loads(additional) if isinstance(additional, str) else additional
+                stage = fields.get("generationStage", "FINAL")
+            except (json.JSONDecodeError, AttributeError):
+                stage = "FINAL"
+            self._current_generation_stage = stage
+            if isinstance(additional, str):
+                self._last_additional_raw = additional
+                self._last_generation_stage = stage
+
+        if content_type == "AUDIO" and self._current_role == "ASSISTANT":
+            await self.output_queue.put({"type": "speaking"})
+        elif content_type == "TEXT" and self._current_role == "ASSISTANT":
+            # Only notify "thinking" for SPECULATIVE (avoid double)
+            if self._current_generation_stage == "SPECULATIVE":
+                await self.output_queue.put({"type": "thinking"})
+
+    async def _on_tool_use(self, event: dict):
+        await self._flush_text()
+        tool_name = event.get("toolName", "")
+        tool_use_id = event.get("toolUseId", "")
+        tool_content = event.get("content", "")
+        await self.output_queue.put({"type": "tool_use", "tool": tool_name})
+        self._pending_tool = {"name": tool_name, "id": tool_use_id, "content": tool_content}
+
+    async def _on_content_end(self, event: dict):
+        if event.get("type", "") == "TOOL" and self._pending_tool:
+            await self._handle_tool_result(event.get("promptName", self._prompt_name))
+
+    async def _on_usage_event(self, event: dict):
+        # Usage events - ignore
+        pass
+
+    # Completion events - ignore (model manages turns internally)
+    async def _on_completion_start(self, event: dict):
+        logger.debug("📥 completionStart")
+
+    async def _on_completion_end(self, event: dict):
+        logger.debug("📥 completionEnd")
+
+    def _take_text(self) -> str:
+        """Cancel the pending flush timer and return (and clear) the buffered text."""
+        if self._text_flush_handle is not None:
+            self._text_flush_handle.cancel()
+            self._text_flush_handle = None
+        text = "".join(self._text_buf)
+        self._text_buf.clear()
+        return text
+
+    async def _flush_text(self):
+        """Emit buffered assistant text deltas as a single transcript_ai message.
+
+        Awaits queue space like every other message, so a full queue applies
+        backpressure instead of dropping the transcript.
+        """
+        text = self._take_text()
+        if text:
+            await self.output_queue.put({"type": "transcript_ai", "text": text})
+
+    def _start_text_flush(self):
+        """Coalescing timer callback: run the flush as a task (it may wait for space)."""
+        self._text_flush_handle = None
+        self._text_flush_task = asyncio.create_task(self._flush_text())
 
     async def _handle_tool_result(self, prompt_name):
         tool = self._pending_tool
@@ -658,7 +1005,7 @@ class NovaSonicSession:
         else:
             result_json = json.dumps({"result": str(result)})
 
-        tool_content_name = str(uuid.uuid4())
+        tool_content_name = uuid.uuid4().hex
         await self._send_event({
             "event": {
                 "contentStart": {
@@ -678,7 +1025,5 @@ class NovaSonicSession:
         await self._send_event({
             "event": {"toolResult": {"promptName": prompt_name, "contentName": tool_content_name, "content": result_json}}
         })
-        await self._send_event({
-            "event": {"contentEnd": {"promptName": prompt_name, "contentName": tool_content_name}}
-        })
+        await self._send_event(_content_end(prompt_name, tool_content_name))
         logger.info(f"✅ Tool result sent for: {tool['name']}")
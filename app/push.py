@@ -7,30 +7,70 @@ SSE (Server-Sent Events) used for reliable in-app notification delivery.
 
 import asyncio
 import base64
+import functools
+import gzip
 import json
 import logging
 import os
+import re
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import orjson  # optional: faster subscription parsing
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    from pywebpush import webpush
+except ImportError:
+    webpush = None  # push notifications disabled, SSE still works
 
 logger = logging.getLogger(__name__)
 
 # SSE clients (asyncio.Queue per connected client)
-_sse_clients: list[asyncio.Queue] = []
-
-# Notification response log – now persisted to SQLite (see record/get functions below)
+_sse_clients: set[asyncio.Queue] = set()
+
+# Size of the push thread pool, i.e. max Web Push requests in flight during
+# one fan-out (a dedicated pool so it isn't throttled by the default executor)
+PUSH_CONCURRENCY = 32
+# Max requests in flight to a single push service
+PUSH_HOST_CONCURRENCY = 16
+_push_executor: ThreadPoolExecutor | None = None
+_push_session = None
+# Only bodies that would overflow the ~4 KB push limit (after ~100 bytes of
+# aes128gcm overhead) are gzip-compressed; everything else stays plain JSON,
+# which every service worker can read
+PUSH_GZIP_MIN_BYTES = 3900
+# Consecutive failed pushes after which a subscription is dropped
+MAX_PUSH_FAILURES = 3
 
 # VAPID keys
 _vapid_private_key = None
 _vapid_public_key = None
+# Parsed py_vapid signer for the private key (built once, reused per push)
+_vapid_signer = None
+
+# Parsed push subscriptions, reloaded from SQLite after SUBS_CACHE_TTL
+# seconds or when a subscription is added/removed
+SUBS_CACHE_TTL = 30.0
+_subs_cache: list[dict] | None = None
+# Number of stored subscriptions, or None when unknown (lets a push with no
+# subscribers return without touching SQLite)
+_subs_count: int | None = None
+_subs_cache_ts = 0.0
+# endpoint -> (subscription_json, parsed dict) from the last load
+_parsed_subs: dict[str, tuple[str, dict]] = {}
 
 
 def _load_vapid_from_db() -> tuple[str, str]:
     """Try to load VAPID keys from SQLite settings table."""
     try:
-        from app.tools.database import get_db
-        db = get_db()
-        try:
+        from app.tools.database import get_conn
+        with get_conn() as db:
             priv_row = db.execute(
                 "SELECT value FROM settings WHERE key = 'vapid_private_key'"
             ).fetchone()
@@ -40,8 +80,6 @@ def _load_vapid_from_db() -> tuple[str, str]:
             priv = priv_row["value"] if priv_row else ""
             pub = pub_row["value"] if pub_row else ""
             return priv, pub
-        finally:
-            db.close()
     except Exception as e:
         logger.warning(f"⚠️ Could not load VAPID keys from DB: {e}")
         return "", ""
@@ -50,9 +88,8 @@ def _load_vapid_from_db() -> tuple[str, str]:
 def _save_vapid_to_db(private_key: str, public_key: str):
     """Persist VAPID keys to SQLite settings table."""
     try:
-        from app.tools.database import get_db
-        db = get_db()
-        try:
+        from app.tools.database import get_conn
+        with get_conn() as db:
             db.execute(
                 """INSERT INTO settings (key, value, description)
                    VALUES ('vapid_private_key', ?, 'VAPID private key for Web Push (auto-generated)')
@@ -67,8 +104,6 @@ def _save_vapid_to_db(private_key: str, public_key: str):
             )
             db.commit()
             logger.info("🔑 VAPID keys saved to database")
-        finally:
-            db.close()
     except Exception as e:
         logger.warning(f"⚠️ Could not save VAPID keys to DB: {e}")
 
@@ -129,6 +164,20 @@ def _ensure_vapid_keys():
         logger.warning(f"⚠️ VAPID key generation failed: {e}")
 
 
+def _get_vapid_signer():
+    """Return the VAPID private key for pywebpush, parsed once when possible."""
+    global _vapid_signer
+    if _vapid_signer is None:
+        try:
+            from py_vapid import Vapid
+            _vapid_signer = Vapid.from_string(private_key=_vapid_private_key)
+        except Exception as e:
+            # pywebpush can still parse the raw string itself on every send
+            logger.warning(f"⚠️ Could not pre-parse VAPID key: {e}")
+            return _vapid_private_key
+    return _vapid_signer
+
+
 def get_vapid_public_key() -> str:
     """Get the VAPID public key for frontend subscription."""
     _ensure_vapid_keys()
@@ -137,138 +186,159 @@ def get_vapid_public_key() -> str:
 
 def add_subscription(subscription_info: dict, user_agent: str = ""):
     """Store a push subscription in SQLite (upsert by endpoint)."""
-    from app.tools.database import get_db
+    from app.tools.database import get_conn
 
     endpoint = subscription_info.get("endpoint", "")
     keys = subscription_info.get("keys", {})
-    keys_p256dh = keys.get("p256dh", "")
-    keys_auth = keys.get("auth", "")
-    sub_json = json.dumps(subscription_info)
 
-    if not endpoint or not keys_p256dh or not keys_auth:
+    if not endpoint or not keys.get("p256dh") or not keys.get("auth"):
         logger.warning("📲 Invalid push subscription — missing endpoint or keys")
         return
 
-    db = get_db()
-    try:
+    # The keys live inside subscription_json, which is what pywebpush reads
+    with get_conn() as db:
         db.execute(
-            """INSERT INTO push_subscriptions (endpoint, keys_p256dh, keys_auth, subscription_json, user_agent)
-               VALUES (?, ?, ?, ?, ?)
+            """INSERT INTO push_subscriptions (endpoint, subscription_json, user_agent)
+               VALUES (?, ?, ?)
                ON CONFLICT(endpoint) DO UPDATE SET
-                   keys_p256dh = excluded.keys_p256dh,
-                   keys_auth = excluded.keys_auth,
                    subscription_json = excluded.subscription_json,
                    user_agent = excluded.user_agent,
                    fail_count = 0""",
-            (endpoint, keys_p256dh, keys_auth, sub_json, user_agent),
+            (endpoint, json.dumps(subscription_info), user_agent),
         )
         db.commit()
-        count = db.execute("SELECT COUNT(*) FROM push_subscriptions").fetchone()[0]
-        logger.info(f"📲 Push subscription saved (total: {count})")
-    finally:
-        db.close()
+    invalidate_subscriptions_cache()
+    logger.info(f"📲 Push subscription saved: {endpoint[:50]}...")
+
+
+def invalidate_subscriptions_cache(count: int | None = None):
+    """Drop the cached subscription list; count is the new total if known."""
+    global _subs_cache, _subs_count
+    _subs_cache = None
+    _subs_count = count
 
 
 def get_all_subscriptions() -> list[dict]:
-    """Load all push subscriptions from SQLite."""
-    from app.tools.database import get_db
+    """Load all push subscriptions (cached for SUBS_CACHE_TTL seconds).
 
-    db = get_db()
-    try:
+    The returned list is shared with the cache; don't mutate it.
+    """
+    global _subs_cache, _subs_cache_ts, _subs_count
+    if _subs_cache is not None and time.monotonic() - _subs_cache_ts < SUBS_CACHE_TTL:
+        return _subs_cache
+
+    from app.tools.database import get_conn
+
+    global _parsed_subs
+    with get_conn() as db:
         rows = db.execute("SELECT endpoint, subscription_json FROM push_subscriptions").fetchall()
-        subs = []
-        for row in rows:
+    subs = []
+    parsed = {}
+    for endpoint, sub_json in rows:
+        # Rows whose JSON hasn't changed since the last load keep their dict
+        prev = _parsed_subs.get(endpoint)
+        if prev is not None and prev[0] == sub_json:
+            sub = prev[1]
+        else:
             try:
-                subs.append(json.loads(row["subscription_json"]))
-            except (json.JSONDecodeError, KeyError):
-                logger.warning(f"📲 Skipping invalid subscription: {row['endpoint'][:50]}...")
-        return subs
-    finally:
-        db.close()
+                sub = _loads(sub_json)
+            except (json.JSONDecodeError, TypeError):
+                logger.warning(f"📲 Skipping invalid subscription: {endpoint[:50]}...")
+                continue
+        parsed[endpoint] = (sub_json, sub)
+        subs.append(sub)
+    _parsed_subs = parsed
+    _subs_cache, _subs_cache_ts = subs, time.monotonic()
+    _subs_count = len(subs)
+    return subs
 
 
 def remove_subscription(endpoint: str):
     """Remove a push subscription from SQLite by endpoint."""
-    from app.tools.database import get_db
+    from app.tools.database import get_conn
 
-    db = get_db()
-    try:
+    with get_conn() as db:
         db.execute("DELETE FROM push_subscriptions WHERE endpoint = ?", (endpoint,))
         db.commit()
-        logger.info(f"📲 Push subscription removed: {endpoint[:50]}...")
-    finally:
-        db.close()
+    invalidate_subscriptions_cache()
+    logger.info(f"📲 Push subscription removed: {endpoint[:50]}...")
 
 
-def _increment_fail_count(endpoint: str):
-    """Increment fail counter; remove subscription if too many failures."""
-    from app.tools.database import get_db
-
-    max_failures = 3
-    db = get_db()
-    try:
-        db.execute(
-            "UPDATE push_subscriptions SET fail_count = fail_count + 1 WHERE endpoint = ?",
-            (endpoint,),
-        )
-        db.commit()
-        row = db.execute(
-            "SELECT fail_count FROM push_subscriptions WHERE endpoint = ?", (endpoint,)
-        ).fetchone()
-        if row and row["fail_count"] >= max_failures:
-            db.execute("DELETE FROM push_subscriptions WHERE endpoint = ?", (endpoint,))
-            db.commit()
-            logger.warning(f"📲 Subscription removed after {max_failures} failures: {endpoint[:50]}...")
-    finally:
-        db.close()
+def _record_push_results(successes: list[str], failures: list[str]):
+    """Store the outcome of one fan-out in a single transaction.
 
+    Successful endpoints get their fail count reset; failed ones are
+    incremented and removed once they reach MAX_PUSH_FAILURES.
+    """
+    if not successes and not failures:
+        return
 
-def _mark_success(endpoint: str):
-    """Reset fail count and update last success timestamp."""
-    from app.tools.database import get_db
+    from app.tools.database import get_conn
 
-    db = get_db()
-    try:
-        db.execute(
-            "UPDATE push_subscriptions SET fail_count = 0, last_success_at = CURRENT_TIMESTAMP WHERE endpoint = ?",
-            (endpoint,),
-        )
+    removed = []
+    with get_conn() as db:
+        if successes:
+            db.executemany(
+                "UPDATE push_subscriptions SET fail_count = 0, last_success_at = CURRENT_TIMESTAMP WHERE endpoint = ?",
+                [(e,) for e in successes],
+            )
+        if failures:
+            placeholders = ",".join("?" * len(failures))
+            db.execute(
+                f"UPDATE push_subscriptions SET fail_count = fail_count + 1 WHERE endpoint IN ({placeholders})",
+                failures,
+            )
+            # One sweep purges every saturated endpoint (a success resets the
+            # count, so anything at the limit failed that many times in a row)
+            removed = [
+                r["endpoint"] for r in db.execute(
+                    "DELETE FROM push_subscriptions WHERE fail_count >= ? RETURNING endpoint",
+                    (MAX_PUSH_FAILURES,),
+                ).fetchall()
+            ]
         db.commit()
-    finally:
-        db.close()
+
+    if removed:
+        invalidate_subscriptions_cache()
+        for endpoint in removed:
+            logger.warning(f"📲 Subscription removed after {MAX_PUSH_FAILURES} failures: {endpoint[:50]}...")
 
 
 # ── SSE (Server-Sent Events) ─────────────────────────────────────────
 
 def add_sse_client(queue: asyncio.Queue):
     """Register a new SSE client."""
-    _sse_clients.append(queue)
+    _sse_clients.add(queue)
     logger.info(f"📡 SSE client connected (total: {len(_sse_clients)})")
 
 
 def remove_sse_client(queue: asyncio.Queue):
     """Remove an SSE client."""
-    if queue in _sse_clients:
-        _sse_clients.remove(queue)
+    _sse_clients.discard(queue)
     logger.info(f"📡 SSE client disconnected (total: {len(_sse_clients)})")
 
 
 async def broadcast_to_sse(data: dict):
-    """Send a notification to all connected SSE clients."""
+    """Send a notification to all connected SSE clients.
+
+    The SSE frame is serialized once and the same bytes are queued for
+    every client.
+    """
     if not _sse_clients:
         return 0
 
+    message = f"data: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
     sent = 0
-    dead = []
+    dead = set()
     for queue in _sse_clients:
         try:
-            queue.put_nowait(data)
+            queue.put_nowait(message)
             sent += 1
         except asyncio.QueueFull:
-            dead.append(queue)
+            dead.add(queue)
 
-    for q in dead:
-        _sse_clients.remove(q)
+    if dead:
+        _sse_clients.difference_update(dead)
 
     if sent > 0:
         logger.info(f"📡 SSE broadcast to {sent} client(s)")
@@ -279,107 +349,93 @@ async def broadcast_to_sse(data: dict):
 
 def record_notification_response(notification_id: str, action: str, source: str):
     """Record a user's response to a notification (persisted to SQLite)."""
-    from app.tools.database import get_db
-    conn = get_db()
-    conn.execute(
-        "INSERT INTO notification_responses (notification_id, action, source) VALUES (?, ?, ?)",
-        (notification_id, action, source),
-    )
-    conn.commit()
-    conn.close()
+    from app.tools.database import get_conn
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT INTO notification_responses (notification_id, action, source) VALUES (?, ?, ?)",
+            (notification_id, action, source),
+        )
+        conn.commit()
     logger.info(f"📋 Notification response: id={notification_id} action={action} source={source}")
 
 
 def get_notification_responses() -> list:
     """Get all notification responses (persisted in SQLite)."""
-    from app.tools.database import get_db
-    conn = get_db()
-    rows = conn.execute(
-        "SELECT notification_id, action, source, created_at FROM notification_responses ORDER BY created_at DESC LIMIT 200"
-    ).fetchall()
-    conn.close()
+    from app.tools.database import get_conn
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT notification_id, action, source, created_at FROM notification_responses ORDER BY created_at DESC LIMIT 200"
+        ).fetchall()
     return [dict(r) for r in rows]
 
 
 # ── Medication Snooze ─────────────────────────────────────────────
 
+# Medication notification IDs: "med_{med_id}_{date}" (+ "_snooze" for re-sends)
+_MED_NOTIF_RE = re.compile(r"med_(\d+)_")
+
+
 def add_medication_snooze(medication_id: int, minutes: int = 15):
     """Snooze a medication reminder for N minutes."""
-    from app.tools.database import get_db
-    from datetime import datetime, timedelta
-    snooze_until = (datetime.now() + timedelta(minutes=minutes)).isoformat()
-    conn = get_db()
-    conn.execute(
-        "INSERT INTO medication_snoozes (medication_id, snooze_until) VALUES (?, ?)",
-        (medication_id, snooze_until),
-    )
-    conn.commit()
-    conn.close()
-    logger.info(f"⏰ Medication {medication_id} snoozed until {snooze_until}")
+    from app.tools.database import get_conn
+    snooze_until = int(time.time()) + minutes * 60
+    with get_conn() as conn:
+        conn.execute(
+            "INSERT INTO medication_snoozes (medication_id, snooze_until) VALUES (?, ?)",
+            (medication_id, snooze_until),
+        )
+        conn.commit()
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
+    logger.info(f"⏰ Medication {medication_id} snoozed for {minutes} min")
 
 
 def is_medication_snoozed(medication_id: int) -> bool:
     """Check if a medication is currently snoozed."""
-    from app.tools.database import get_db
-    from datetime import datetime
-    conn = get_db()
-    row = conn.execute(
-        "SELECT snooze_until FROM medication_snoozes WHERE medication_id = ? ORDER BY snooze_until DESC LIMIT 1",
-        (medication_id,),
-    ).fetchone()
-    conn.close()
-    if not row:
-        return False
-    try:
-        snooze_until = datetime.fromisoformat(row["snooze_until"])
-        return datetime.now() < snooze_until
-    except (ValueError, TypeError):
-        return False
+    from app.tools.database import get_conn
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM medication_snoozes WHERE medication_id = ? AND snooze_until > ? LIMIT 1",
+            (medication_id, int(time.time())),
+        ).fetchone()
+    return row is not None
 
 
-def confirm_medication_from_notification(notification_id: str):
-    """Extract medication ID from notification_id and confirm it as taken."""
-    from app.tools.database import get_db
-    # notification_id format: "med_{med_id}_{date}"
-    parts = notification_id.split("_")
-    if len(parts) < 3 or parts[0] != "med":
+def _parse_med_notification_id(notification_id: str) -> int | None:
+    """Return the medication ID from a "med_{med_id}_{date}[...]" notification_id."""
+    m = _MED_NOTIF_RE.match(notification_id)
+    if not m:
         logger.warning(f"⚠️ Cannot parse medication notification_id: {notification_id}")
-        return
+        return None
+    return int(m.group(1))
 
-    try:
-        med_id = int(parts[1])
-    except ValueError:
-        logger.warning(f"⚠️ Invalid medication ID in notification_id: {notification_id}")
-        return
 
-    conn = get_db()
-    row = conn.execute("SELECT id, name FROM medications WHERE id = ?", (med_id,)).fetchone()
-    if not row:
-        conn.close()
-        logger.warning(f"⚠️ Medication ID {med_id} not found")
+def confirm_medication_from_notification(notification_id: str):
+    """Extract medication ID from notification_id and confirm it as taken."""
+    from app.tools.database import get_conn
+    med_id = _parse_med_notification_id(notification_id)
+    if med_id is None:
         return
 
-    # Log to medication_log
-    conn.execute(
-        "INSERT INTO medication_log (medication_id, confirmed_by) VALUES (?, 'notification')",
-        (med_id,),
-    )
-    conn.commit()
-    conn.close()
+    with get_conn() as conn:
+        row = conn.execute("SELECT id, name FROM medications WHERE id = ?", (med_id,)).fetchone()
+        if not row:
+            logger.warning(f"⚠️ Medication ID {med_id} not found")
+            return
+
+        # Log to medication_log
+        conn.execute(
+            "INSERT INTO medication_log (medication_id, confirmed_by) VALUES (?, 'notification')",
+            (med_id,),
+        )
+        conn.commit()
     logger.info(f"💊 Medication '{row['name']}' confirmed via notification button")
 
 
 def snooze_medication_from_notification(notification_id: str, minutes: int = 15):
     """Extract medication ID from notification_id and snooze it."""
-    parts = notification_id.split("_")
-    if len(parts) < 3 or parts[0] != "med":
-        logger.warning(f"⚠️ Cannot parse medication notification_id: {notification_id}")
-        return
-
-    try:
-        med_id = int(parts[1])
-    except ValueError:
-        logger.warning(f"⚠️ Invalid medication ID in notification_id: {notification_id}")
+    med_id = _parse_med_notification_id(notification_id)
+    if med_id is None:
         return
 
     add_medication_snooze(med_id, minutes)
@@ -416,26 +472,47 @@ async def send_notification(
     sse_sent = await broadcast_to_sse(payload)
 
     # 2) Web Push (for closed app / background – async)
-    push_sent = _send_web_push(payload)
+    push_sent = await _send_web_push(payload)
 
     logger.info(f"📲 Notification sent: SSE={sse_sent} Push={push_sent} id={notification_id}")
     return {"sse": sse_sent, "push": push_sent, "notification_id": notification_id}
 
 
-def _send_web_push(payload: dict) -> int:
-    """Send Web Push to all subscribers from SQLite."""
-    _ensure_vapid_keys()
+def _get_push_session():
+    """Shared requests session so pushes reuse TLS connections per push service."""
+    global _push_session
+    if _push_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
 
-    if not _vapid_private_key or not _vapid_public_key:
+        session = requests.Session()
+        # One pool per push service host, sized for its in-flight limit
+        session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=PUSH_HOST_CONCURRENCY))
+        _push_session = session
+    return _push_session
+
+
+def _get_push_executor() -> ThreadPoolExecutor:
+    """Thread pool for blocking pywebpush requests (created on first push)."""
+    global _push_executor
+    if _push_executor is None:
+        _push_executor = ThreadPoolExecutor(max_workers=PUSH_CONCURRENCY, thread_name_prefix="webpush")
+    return _push_executor
+
+
+async def _send_web_push(payload: dict) -> int:
+    """Send Web Push to all subscribers from SQLite (concurrently)."""
+    if _subs_count == 0 or webpush is None:
         return 0
 
-    subscriptions = get_all_subscriptions()
-    if not subscriptions:
+    # Key setup and the subscription load may hit SQLite; keep them off the loop
+    await asyncio.to_thread(_ensure_vapid_keys)
+
+    if not _vapid_private_key or not _vapid_public_key:
         return 0
 
-    try:
-        from pywebpush import webpush, WebPushException
-    except ImportError:
+    subscriptions = await asyncio.to_thread(get_all_subscriptions)
+    if not subscriptions:
         return 0
 
     # Web Push payload (include actions for system notification buttons)
@@ -448,43 +525,74 @@ def _send_web_push(payload: dict) -> int:
         "icon": "/static/icons/icon-192.png",
         "badge": "/static/icons/badge-96.png",
         "actions": payload.get("actions", []),
-    })
+    }).encode()
+    if len(push_data) >= PUSH_GZIP_MIN_BYTES:
+        # Push services cap payloads at ~4 KB; sw.js inflates gzip bodies
+        # where the browser has DecompressionStream
+        compressed = gzip.compress(push_data, compresslevel=6)
+        if len(compressed) < len(push_data):
+            push_data = compressed
 
     vapid_claims = {
         "sub": "mailto:sonic2life@example.com",
     }
 
-    sent = 0
+    # pywebpush is blocking; each request runs on the push thread pool
+    loop = asyncio.get_running_loop()
+    executor = _get_push_executor()
+    session = _get_push_session()
+    vapid_key = _get_vapid_signer()
 
-    for sub in subscriptions:
+    successes: list[str] = []
+    failures: list[str] = []
+
+    async def send_one(sub: dict, limit: asyncio.Semaphore):
         endpoint = sub.get("endpoint", "")
-        try:
-            webpush(
-                headers={"Urgency": "high"},
-                ttl=86400,
-                subscription_info=sub,
-                data=push_data,
-                vapid_private_key=_vapid_private_key,
-                vapid_claims=vapid_claims.copy(),
-            )
-            sent += 1
-            _mark_success(endpoint)
-        except Exception as e:
-            logger.warning(f"📲 Push failed for endpoint: {e}")
-            _increment_fail_count(endpoint)
+        async with limit:
+            try:
+                await loop.run_in_executor(executor, functools.partial(
+                    webpush,
+                    headers={"Urgency": "high"},
+                    ttl=86400,
+                    subscription_info=sub,
+                    data=push_data,
+                    vapid_private_key=vapid_key,
+                    vapid_claims=vapid_claims.copy(),
+                    requests_session=session,
+                ))
+            except Exception as e:
+                logger.warning(f"📲 Push failed for endpoint: {e}")
+                failures.append(endpoint)
+                return
+        successes.append(endpoint)
+
+    async def send_to_service(subs: list[dict]):
+        limit = asyncio.Semaphore(PUSH_HOST_CONCURRENCY)
+        await asyncio.gather(*(send_one(sub, limit) for sub in subs))
+
+    # Group by push service (fcm.googleapis.com, updates.push.services.mozilla.com,
+    # ...) so a slow service can't take every worker from the others
+    by_service: dict[str, list[dict]] = {}
+    for sub in subscriptions:
+        by_service.setdefault(urlsplit(sub.get("endpoint", "")).netloc, []).append(sub)
 
-    return sent
+    await asyncio.gather(*(send_to_service(subs) for subs in by_service.values()))
+    await asyncio.to_thread(_record_push_results, successes, failures)
+    return len(successes)
 
 
 # ── Legacy function (kept for backwards compat) ──────────────────────
 
 def send_push_notification(title: str, body: str, tag: str = "sonic2life", url: str = "/"):
-    """Legacy sync wrapper – sends Web Push only (no SSE)."""
-    return _send_web_push({
+    """Legacy sync wrapper – sends Web Push only (no SSE).
+
+    Must not be called from a running event loop (use send_notification there).
+    """
+    return asyncio.run(_send_web_push({
         "title": title,
         "body": body,
         "tag": tag,
         "url": url,
         "notification_id": "",
         "actions": [],
-    })
+    }))
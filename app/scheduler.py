@@ -1,132 +1,257 @@
 """Sonic2Life Scheduler – Background task for medication & event reminders."""
 
 import asyncio
+import contextlib
+import functools
 import logging
-from datetime import datetime, timedelta
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-from app.tools.database import get_db
-from app.push import send_notification, is_medication_snoozed
+from app.tools.database import close_db, open_db
+from app.push import send_notification
 
 logger = logging.getLogger(__name__)
 
 _scheduler_task: asyncio.Task | None = None
 
+# One connection held for the lifetime of the scheduler task
+_scheduler_conn = None
+_scheduler_lock = asyncio.Lock()
+# Blocking SQLite work runs on this single thread so it never stalls the
+# event loop (voice sessions) and _scheduler_conn is used by one thread at a time
+_db_executor: ThreadPoolExecutor | None = None
+
+# Settings read by the scheduler; cleared by invalidate_settings() on admin writes
+_settings_cache: dict[str, str] = {}
+
+# Set by notify_scheduler() so the loop re-plans instead of sleeping on
+_wake_event: asyncio.Event | None = None
+_wake_loop: asyncio.AbstractEventLoop | None = None
+
+# Wake-ups can land anywhere in a reminder's ±2 min window, so medication
+# reminders remember when they were sent to avoid going out twice
+RESEND_GUARD_SECONDS = 10 * 60
+_recently_sent: dict[str, float] = {}
+
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+# (day bitmask, minute of day) per active medication for _next_due(), tagged
+# with the _med_slots_version it was built at; notify_scheduler() bumps it
+_med_slots: tuple[int, list[tuple[int, int]]] | None = None
+_med_slots_version = 0
+
+# Sleep bounds: never wake more often than MIN_SLEEP_SECONDS, and spread the
+# interval-capped polls by ±SLEEP_JITTER so instances sharing a DB don't align
+MIN_SLEEP_SECONDS = 30
+SLEEP_JITTER = 0.1
+
+# Expired snoozes older than a day are purged at most once per hour
+SNOOZE_CLEANUP_INTERVAL = 3600
+_last_snooze_cleanup: float | None = None
+
+# ── SQL ───────────────────────────────────────────────────────────
+# Kept as constants so every tick reuses the connection's cached statements.
+
+# Format of SQLite's CURRENT_TIMESTAMP (UTC), e.g. medication_log.taken_at
+_DB_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SQL_GET_SETTING = "SELECT value FROM settings WHERE key = ?"
+
+# schedule_time zero-padded so '8:00' compares as '08:00'
+_SCHED_HHMM = "substr('0' || m.schedule_time, -5)"
+
+# One scan for both medication reminder kinds:
+#  'due'    – scheduled today, due now and not yet taken today
+#  'snooze' – a snooze expired within the last scheduler cycle, not taken today
+# `snoozed` flags medications that are currently snoozed (again).
+_SQL_DUE_MEDS_TEMPLATE = """
+    SELECT 'due' AS kind, m.id, m.name, m.dosage, m.notes, m.schedule_time,
+           EXISTS (SELECT 1 FROM medication_snoozes s
+                   WHERE s.medication_id = m.id AND s.snooze_until > :now) AS snoozed
+    FROM medications m
+    LEFT JOIN medication_log ml
+      ON ml.medication_id = m.id AND ml.taken_at >= :day_start AND ml.taken_at < :day_end
+    WHERE m.active = 1 AND ml.id IS NULL
+      AND (',' || m.days || ',') LIKE :day
+      AND {time_cond}
+    UNION ALL
+    SELECT DISTINCT 'snooze', m.id, m.name, m.dosage, m.notes, NULL,
+           EXISTS (SELECT 1 FROM medication_snoozes s
+                   WHERE s.medication_id = m.id AND s.snooze_until > :now)
+    FROM medication_snoozes ms
+    JOIN medications m ON ms.medication_id = m.id
+    WHERE ms.snooze_until <= :now
+      AND ms.snooze_until >= :since
+      AND m.active = 1
+      AND ms.medication_id NOT IN (
+          SELECT medication_id FROM medication_log
+          WHERE taken_at >= :day_start AND taken_at < :day_end
+      )
+"""
+SQL_DUE_MEDS = _SQL_DUE_MEDS_TEMPLATE.format(time_cond=f"{_SCHED_HHMM} BETWEEN :lo AND :hi")
+# Variant for a ±2 min window that wraps past midnight (lo > hi)
+SQL_DUE_MEDS_WRAPPED = _SQL_DUE_MEDS_TEMPLATE.format(
+    time_cond=f"({_SCHED_HHMM} >= :lo OR {_SCHED_HHMM} <= :hi)"
+)
+
+SQL_PENDING_EVENTS = """
+    SELECT id, title, description, event_time, reminder_minutes
+    FROM events
+    WHERE active = 1 AND notified = 0
+"""
+
+SQL_BRIEF_EVENTS = """
+    SELECT id, title, description, event_time, reminder_minutes
+    FROM events
+    WHERE active = 1 AND morning_brief = 1 AND brief_sent = 0
+        AND event_time >= ? AND event_time < ?
+"""
+
+SQL_MED_SLOTS = "SELECT schedule_time, days FROM medications WHERE active = 1"
+SQL_NEXT_SNOOZE = "SELECT MIN(snooze_until) FROM medication_snoozes WHERE snooze_until > ?"
+SQL_PURGE_SNOOZES = "DELETE FROM medication_snoozes WHERE snooze_until < ?"
+
 
 def _get_setting(conn, key: str, default: str = "") -> str:
     """Get a single setting value from DB."""
-    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    row = conn.execute(SQL_GET_SETTING, (key,)).fetchone()
     return row["value"] if row else default
 
 
-def _get_timezone_offset():
-    """Get timezone offset. For simplicity, uses pytz if available, else UTC."""
-    try:
-        import zoneinfo
-        from app.tools.database import get_db
-        conn = get_db()
-        tz_name = _get_setting(conn, "timezone", "Europe/Prague")
-        conn.close()
-        tz = zoneinfo.ZoneInfo(tz_name)
-        now = datetime.now(tz)
-        return now, tz
-    except Exception:
-        return datetime.utcnow(), None
+def _get_setting_cached(conn, key: str, default: str = "") -> str:
+    """Get a setting via the in-memory cache, reading the DB on a miss."""
+    if key not in _settings_cache:
+        _settings_cache[key] = _get_setting(conn, key, default)
+    return _settings_cache[key]
 
 
-async def _check_medications():
-    """Check if any medications are due and send notifications."""
-    try:
-        now, tz = _get_timezone_offset()
-        current_time = now.strftime("%H:%M")
-        current_day = now.strftime("%a").lower()
-
-        conn = get_db()
-        meds = conn.execute(
-            "SELECT id, name, dosage, schedule_time, days, notes FROM medications WHERE active = 1"
-        ).fetchall()
-
-        for med in meds:
-            # Check if today is a scheduled day
-            days = [d.strip() for d in med["days"].split(",")]
-            if current_day not in days:
-                continue
+def invalidate_settings():
+    """Drop cached settings so the next scheduler tick re-reads them."""
+    _settings_cache.clear()
 
-            # Check if it's time (within 2-minute window)
-            sched_time = med["schedule_time"]
-            try:
-                sched_h, sched_m = map(int, sched_time.split(":"))
-                now_h, now_m = map(int, current_time.split(":"))
-                diff_minutes = abs((now_h * 60 + now_m) - (sched_h * 60 + sched_m))
-            except ValueError:
-                continue
 
-            if diff_minutes > 2:
-                continue
+@functools.lru_cache(maxsize=8)
+def _zoneinfo(tz_name: str):
+    import zoneinfo
+    return zoneinfo.ZoneInfo(tz_name)
 
-            # Check if already notified today
-            today_str = now.strftime("%Y-%m-%d")
-            already = conn.execute(
-                "SELECT id FROM medication_log WHERE medication_id = ? AND taken_at LIKE ?",
-                (med["id"], f"{today_str}%"),
-            ).fetchone()
 
-            if already:
-                continue
+def _get_scheduler_conn():
+    """Return the scheduler's connection, opening it on first use."""
+    global _scheduler_conn
+    if _scheduler_conn is None:
+        _scheduler_conn = open_db()
+    return _scheduler_conn
 
-            # Check if snoozed
-            if is_medication_snoozed(med["id"]):
-                logger.info(f"💤 Medication '{med['name']}' is snoozed, skipping")
-                continue
 
-            # Send notification!
-            dosage_text = f" ({med['dosage']})" if med["dosage"] else ""
-            body = f"💊 Time to take: {med['name']}{dosage_text}"
-            if med["notes"]:
-                body += f"\n{med['notes']}"
+def _get_db_executor() -> ThreadPoolExecutor:
+    """Return the scheduler's single DB thread, creating it on first use."""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scheduler-db")
+    return _db_executor
 
-            notification_id = f"med_{med['id']}_{today_str}"
-            await send_notification(
-                title="Medication Reminder",
-                body=body,
-                tag="medication",
-                notification_id=notification_id,
-                actions=[
-                    {"action": "taken", "title": "✅ Taken"},
-                    {"action": "snooze", "title": "⏰ Snooze 15min"},
-                ],
-            )
-            logger.info(f"💊 Medication reminder sent: {med['name']} at {sched_time}")
 
-        # ── Check for expired snoozes (re-send reminder after snooze period) ──
+async def _run_db(fn, *args):
+    """Run a blocking DB function on the scheduler's DB thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_db_executor(), functools.partial(fn, *args))
+
+
+def _query(conn, sql: str, params=()) -> list:
+    """Execute a SELECT and fetch all rows."""
+    return conn.execute(sql, params).fetchall()
+
+
+def _load_loop_settings(conn):
+    """Read (enabled, interval minutes, timezone) for one scheduler tick.
+
+    Runs on the DB thread, so the loop itself never touches the settings table.
+    """
+    enabled = _get_setting_cached(conn, "scheduler_enabled", "true").lower() == "true"
+    interval = int(_get_setting_cached(conn, "scheduler_interval_minutes", "5"))
+    try:
+        tz = _zoneinfo(_get_setting_cached(conn, "timezone", "Europe/Prague"))
+    except Exception:
+        tz = None
+    return enabled, interval, tz
+
+
+def _close_scheduler_conn():
+    """Optimize and close the scheduler's connection."""
+    global _scheduler_conn
+    if _scheduler_conn is not None:
+        close_db(_scheduler_conn)
+        _scheduler_conn = None
+
+
+def _local_now(tz):
+    """Current time in the configured timezone, or UTC when it is unknown."""
+    return datetime.now(tz or timezone.utc)
+
+
+def _already_sent(notification_id: str) -> bool:
+    """True if this reminder went out within RESEND_GUARD_SECONDS (prunes old entries)."""
+    cutoff = time.monotonic() - RESEND_GUARD_SECONDS
+    for key in [k for k, ts in _recently_sent.items() if ts < cutoff]:
+        del _recently_sent[key]
+    return notification_id in _recently_sent
+
+
+def _fetch_due_medications(conn, now: datetime) -> list:
+    """Medications due now plus expired snoozes, as one 'kind'-tagged result."""
+    current_day = _WEEKDAYS[now.weekday()]
+    # ±2-minute window; wraps around midnight when lo > hi
+    lo = (now - timedelta(minutes=2)).strftime("%H:%M")
+    hi = (now + timedelta(minutes=2)).strftime("%H:%M")
+    # taken_at is CURRENT_TIMESTAMP (UTC), so bound the local day in UTC; a
+    # plain range (not LIKE) keeps idx_medlog_med_taken usable
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_start = midnight.astimezone(timezone.utc).strftime(_DB_TIMESTAMP_FORMAT)
+    day_end = (midnight + timedelta(days=1)).astimezone(timezone.utc).strftime(_DB_TIMESTAMP_FORMAT)
+    now_ts = int(now.timestamp())
+
+    sql = SQL_DUE_MEDS if lo <= hi else SQL_DUE_MEDS_WRAPPED
+    return conn.execute(sql, {
+        "now": now_ts,
+        "since": now_ts - 6 * 60,  # within last scheduler cycle
+        "day_start": day_start,
+        "day_end": day_end,
+        "day": f"%,{current_day},%",
+        "lo": lo,
+        "hi": hi,
+    }).fetchall()
+
+
+async def _check_medications(conn, tz):
+    """Check if any medications are due and send notifications."""
+    try:
+        now = _local_now(tz)
         today_str = now.strftime("%Y-%m-%d")
-        expired_snoozes = conn.execute("""
-            SELECT DISTINCT ms.medication_id, m.name, m.dosage, m.notes
-            FROM medication_snoozes ms
-            JOIN medications m ON ms.medication_id = m.id
-            WHERE ms.snooze_until <= ?
-              AND ms.snooze_until >= ?
-              AND m.active = 1
-              AND ms.medication_id NOT IN (
-                  SELECT medication_id FROM medication_log
-                  WHERE taken_at LIKE ?
-              )
-        """, (
-            now.isoformat(),
-            (now - timedelta(minutes=6)).isoformat(),  # within last scheduler cycle
-            f"{today_str}%",
-        )).fetchall()
-
-        for med in expired_snoozes:
-            # Don't re-send if currently snoozed again
-            if is_medication_snoozed(med["medication_id"]):
+        rows = await _run_db(_fetch_due_medications, conn, now)
+
+        for med in rows:
+            due = med["kind"] == "due"
+
+            # Check if snoozed (for expired snoozes: snoozed again)
+            if med["snoozed"]:
+                if due:
+                    logger.info(f"💤 Medication '{med['name']}' is snoozed, skipping")
                 continue
 
             dosage_text = f" ({med['dosage']})" if med["dosage"] else ""
-            body = f"💊 Reminder (after snooze): {med['name']}{dosage_text}"
+            if due:
+                body = f"💊 Time to take: {med['name']}{dosage_text}"
+                notification_id = f"med_{med['id']}_{today_str}"
+            else:
+                body = f"💊 Reminder (after snooze): {med['name']}{dosage_text}"
+                notification_id = f"med_{med['id']}_{today_str}_snooze"
             if med["notes"]:
                 body += f"\n{med['notes']}"
+            if _already_sent(notification_id):
+                continue
 
-            notification_id = f"med_{med['medication_id']}_{today_str}_snooze"
             await send_notification(
                 title="Medication Reminder",
                 body=body,
@@ -137,80 +262,85 @@ async def _check_medications():
                     {"action": "snooze", "title": "⏰ Snooze 15min"},
                 ],
             )
-            logger.info(f"💊 Post-snooze reminder sent: {med['name']}")
-
-        conn.close()
+            _recently_sent[notification_id] = time.monotonic()
+            if due:
+                logger.info(f"💊 Medication reminder sent: {med['name']} at {med['schedule_time']}")
+            else:
+                logger.info(f"💊 Post-snooze reminder sent: {med['name']}")
     except Exception as e:
         logger.error(f"❌ Medication check error: {e}")
 
 
-async def _check_events():
+def _format_hhmm(event_time: str) -> str:
+    """Format an ISO event time as HH:MM ('?' if unparseable)."""
+    try:
+        return datetime.fromisoformat(event_time).strftime("%H:%M")
+    except (ValueError, TypeError):
+        return "?"
+
+
+def _mark_events(conn, column: str, ids: list[int]):
+    """Set a flag column to 1 for all given event ids in one UPDATE."""
+    placeholders = ",".join("?" * len(ids))
+    conn.execute(f"UPDATE events SET {column} = 1 WHERE id IN ({placeholders})", ids)
+    conn.commit()
+
+
+async def _check_events(conn, tz):
     """Check for upcoming events that need reminders or morning brief."""
     try:
-        now, tz = _get_timezone_offset()
-        conn = get_db()
+        now = _local_now(tz)
+        today_str = now.strftime("%Y-%m-%d")
 
         # ── Pre-event reminders ──
-        events = conn.execute("""
-            SELECT id, title, description, event_time, reminder_minutes
-            FROM events
-            WHERE active = 1 AND notified = 0
-        """).fetchall()
-
-        for event in events:
-            try:
-                event_dt = datetime.fromisoformat(event["event_time"])
-                if tz:
-                    import zoneinfo
-                    if event_dt.tzinfo is None:
-                        event_dt = event_dt.replace(tzinfo=tz)
-                reminder_dt = event_dt - timedelta(minutes=event["reminder_minutes"])
-
-                if now >= reminder_dt and now < event_dt:
-                    # Time to notify!
-                    mins_until = int((event_dt - now).total_seconds() / 60)
-                    body = f"📅 {event['title']} in {mins_until} minutes"
-                    if event["description"]:
-                        body += f"\n{event['description']}"
-
-                    await send_notification(
-                        title="Event Reminder",
-                        body=body,
-                        tag="event",
-                        notification_id=f"event_{event['id']}",
-                    )
-
-                    # Mark as notified
-                    conn.execute(
-                        "UPDATE events SET notified = 1 WHERE id = ?",
-                        (event["id"],),
-                    )
-                    conn.commit()
-                    logger.info(f"📅 Event reminder sent: {event['title']}")
-
-            except (ValueError, TypeError) as e:
-                logger.warning(f"⚠️ Invalid event time for '{event['title']}': {e}")
+        events = await _run_db(_query, conn, SQL_PENDING_EVENTS)
+
+        notified_ids = []
+        try:
+            for event in events:
+                try:
+                    event_dt = datetime.fromisoformat(event["event_time"])
+                    if tz:
+                        if event_dt.tzinfo is None:
+                            event_dt = event_dt.replace(tzinfo=tz)
+                    reminder_dt = event_dt - timedelta(minutes=event["reminder_minutes"])
+
+                    if now >= reminder_dt and now < event_dt:
+                        # Time to notify!
+                        mins_until = int((event_dt - now).total_seconds() / 60)
+                        body = f"📅 {event['title']} in {mins_until} minutes"
+                        if event["description"]:
+                            body += f"\n{event['description']}"
+
+                        await send_notification(
+                            title="Event Reminder",
+                            body=body,
+                            tag="event",
+                            notification_id=f"event_{event['id']}",
+                        )
+
+                        notified_ids.append(event["id"])
+                        logger.info(f"📅 Event reminder sent: {event['title']}")
+
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"⚠️ Invalid event time for '{event['title']}': {e}")
+        finally:
+            # Mark everything sent so far as notified in one statement
+            if notified_ids:
+                await _run_db(_mark_events, conn, "notified", notified_ids)
 
         # ── Morning brief (check if between 6:00-9:00 and not yet sent) ──
         current_hour = now.hour
         if 6 <= current_hour <= 9:
-            today_str = now.strftime("%Y-%m-%d")
-            brief_events = conn.execute("""
-                SELECT id, title, description, event_time, reminder_minutes
-                FROM events
-                WHERE active = 1 AND morning_brief = 1 AND brief_sent = 0
-                    AND date(event_time) = ?
-            """, (today_str,)).fetchall()
+            # A text range over the ISO values (not date()) stays on idx_events_brief
+            tomorrow_str = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+            brief_events = await _run_db(_query, conn, SQL_BRIEF_EVENTS, (today_str, tomorrow_str))
 
             if brief_events:
                 body_lines = ["🌅 Today's schedule:"]
-                for ev in brief_events:
-                    try:
-                        ev_dt = datetime.fromisoformat(ev["event_time"])
-                        time_str = ev_dt.strftime("%H:%M")
-                    except Exception:
-                        time_str = "?"
-                    body_lines.append(f"• {time_str} – {ev['title']}")
+                body_lines += [
+                    f"• {_format_hhmm(ev['event_time'])} – {ev['title']}" for ev in brief_events
+                ]
 
                 await send_notification(
                     title="Morning Brief",
@@ -219,35 +349,137 @@ async def _check_events():
                     notification_id=f"brief_{today_str}",
                 )
 
-                # Mark all as brief_sent
-                for ev in brief_events:
-                    conn.execute("UPDATE events SET brief_sent = 1 WHERE id = ?", (ev["id"],))
-                conn.commit()
+                await _run_db(_mark_events, conn, "brief_sent", [ev["id"] for ev in brief_events])
                 logger.info(f"🌅 Morning brief sent with {len(brief_events)} events")
-
-        conn.close()
     except Exception as e:
         logger.error(f"❌ Event check error: {e}")
 
 
+def _load_med_slots(conn) -> list[tuple[int, int]]:
+    """Parse active medications into (weekday bitmask, minute of day) pairs."""
+    slots = []
+    for row in conn.execute(SQL_MED_SLOTS):
+        try:
+            h, m = map(int, row["schedule_time"].split(":"))
+        except (ValueError, AttributeError):
+            continue
+        # days is stored normalized (lower-case, no spaces) by a schema trigger
+        days = set((row["days"] or "").split(","))
+        mask = sum(1 << i for i, d in enumerate(_WEEKDAYS) if d in days)
+        if mask:
+            slots.append((mask, h * 60 + m))
+    return slots
+
+
+def _purge_old_snoozes(conn, now_ts: int) -> int:
+    """Delete snoozes that expired more than a day ago; returns rows removed."""
+    deleted = conn.execute(SQL_PURGE_SNOOZES, (now_ts - 86400,)).rowcount
+    conn.commit()
+    return deleted
+
+
+def _next_due(conn, now: datetime, tz) -> datetime | None:
+    """Earliest upcoming medication time, event reminder, snooze expiry or morning brief."""
+    global _med_slots
+    tz = tz or timezone.utc
+    candidates = []
+
+    version = _med_slots_version
+    if _med_slots is None or _med_slots[0] != version:
+        _med_slots = (version, _load_med_slots(conn))
+
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    weekday = now.weekday()
+    for mask, minute in _med_slots[1]:
+        # First scheduled day (today .. a week ahead) whose time is still ahead
+        for offset in range(8):
+            if mask & (1 << ((weekday + offset) % 7)):
+                due = midnight + timedelta(days=offset, minutes=minute)
+                if due > now:
+                    candidates.append(due)
+                    break
+
+    for row in conn.execute(SQL_PENDING_EVENTS):
+        try:
+            event_dt = datetime.fromisoformat(row["event_time"])
+        except (ValueError, TypeError):
+            continue
+        if event_dt.tzinfo is None:
+            event_dt = event_dt.replace(tzinfo=tz)
+        reminder_dt = event_dt - timedelta(minutes=row["reminder_minutes"] or 0)
+        if reminder_dt > now:
+            candidates.append(reminder_dt)
+
+    snooze_until = conn.execute(SQL_NEXT_SNOOZE, (int(now.timestamp()),)).fetchone()[0]
+    if snooze_until is not None:
+        candidates.append(datetime.fromtimestamp(snooze_until, tz))
+
+    brief = now.replace(hour=6, minute=0, second=0, microsecond=0)
+    candidates.append(brief if brief > now else brief + timedelta(days=1))
+
+    return min(candidates) if candidates else None
+
+
+def schedule_version() -> int:
+    """Counter bumped by notify_scheduler(); tools key cached schedule reads on it."""
+    return _med_slots_version
+
+
+def notify_scheduler():
+    """Wake the scheduler to re-plan after medications, events or snoozes change.
+
+    Safe to call from any thread (tools run outside the event loop).
+    """
+    global _med_slots_version
+    _med_slots_version += 1
+    if _wake_loop is not None and _wake_event is not None:
+        with contextlib.suppress(RuntimeError):  # loop already closed
+            _wake_loop.call_soon_threadsafe(_wake_event.set)
+
+
+async def _sleep_until_woken(seconds: float):
+    """Sleep for `seconds` or until notify_scheduler() is called."""
+    try:
+        await asyncio.wait_for(_wake_event.wait(), timeout=seconds)
+        logger.debug("⏰ Scheduler woken early, re-planning")
+    except asyncio.TimeoutError:
+        pass
+    _wake_event.clear()
+
+
 async def _scheduler_loop():
-    """Main scheduler loop – runs periodically."""
+    """Main scheduler loop – sleeps until the next reminder is due."""
+    global _wake_event, _wake_loop, _last_snooze_cleanup
+    _wake_event = asyncio.Event()
+    _wake_loop = asyncio.get_running_loop()
     logger.info("⏰ Scheduler started")
 
     while True:
         try:
-            conn = get_db()
-            enabled = _get_setting(conn, "scheduler_enabled", "true")
-            interval = int(_get_setting(conn, "scheduler_interval_minutes", "5"))
-            conn.close()
-
-            if enabled.lower() == "true":
-                await _check_medications()
-                await _check_events()
-            else:
-                logger.debug("⏸️ Scheduler disabled, sleeping...")
-
-            await asyncio.sleep(interval * 60)
+            async with _scheduler_lock:
+                conn = await _run_db(_get_scheduler_conn)
+                enabled, interval, tz = await _run_db(_load_loop_settings, conn)
+                # The configured interval is now only an upper bound on the sleep
+                sleep_seconds = interval * 60 * random.uniform(1 - SLEEP_JITTER, 1 + SLEEP_JITTER)
+
+                if enabled:
+                    await _check_medications(conn, tz)
+                    await _check_events(conn, tz)
+                    if (_last_snooze_cleanup is None
+                            or time.monotonic() - _last_snooze_cleanup >= SNOOZE_CLEANUP_INTERVAL):
+                        _last_snooze_cleanup = time.monotonic()
+                        purged = await _run_db(_purge_old_snoozes, conn, int(time.time()))
+                        if purged:
+                            logger.info(f"🧹 Purged {purged} expired medication snoozes")
+                    now = _local_now(tz)
+                    next_due = await _run_db(_next_due, conn, now, tz)
+                    if next_due is not None:
+                        due_in = (next_due - now).total_seconds()
+                        sleep_seconds = min(sleep_seconds, max(MIN_SLEEP_SECONDS, due_in))
+                else:
+                    logger.debug("⏸️ Scheduler disabled, sleeping...")
+
+            await _sleep_until_woken(sleep_seconds)
 
         except asyncio.CancelledError:
             logger.info("⏰ Scheduler stopped")
@@ -275,6 +507,8 @@ async def stop_scheduler():
         except asyncio.CancelledError:
             pass
     _scheduler_task = None
+    async with _scheduler_lock:
+        await _run_db(_close_scheduler_conn)
     logger.info("⏰ Scheduler task stopped")
 
 
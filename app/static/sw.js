@@ -90,19 +90,42 @@ self.addEventListener("fetch", function (event) {
 });
 
 // ── Push: display notification ───────────────────────────────────────
+// Oversized payloads arrive gzip-compressed (magic bytes 1f 8b); plain JSON
+// payloads are handled as before. Everything runs inside the promise, so any
+// failure (including a missing DecompressionStream) becomes a rejection.
+function readPushData(pushData) {
+    return new Promise(function (resolve) {
+        var bytes = new Uint8Array(pushData.arrayBuffer());
+        if (bytes.length > 1 && bytes[0] === 0x1f && bytes[1] === 0x8b) {
+            if (typeof DecompressionStream !== "function") {
+                throw new Error("gzip push payload, but no DecompressionStream");
+            }
+            var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+            resolve(new Response(stream).json());
+            return;
+        }
+        resolve(pushData.json());
+    });
+}
+
 self.addEventListener("push", function (event) {
     console.log("[SW] Push received");
 
     var data = { title: "Sonic2Life", body: "You have a new message", icon: "/static/icons/icon-192.png" };
 
+    var dataPromise = Promise.resolve(data);
     if (event.data) {
-        try {
-            data = event.data.json();
-        } catch (e) {
-            data.body = event.data.text();
-        }
+        dataPromise = readPushData(event.data).catch(function (err) {
+            // Unreadable payload: still notify, with the default body
+            console.warn("[SW] Could not read push payload:", err);
+            return data;
+        });
     }
 
+    event.waitUntil(dataPromise.then(showPushNotification));
+});
+
+function showPushNotification(data) {
     // Build system notification actions from payload
     var notifActions = [];
     if (data.actions && data.actions.length > 0) {
@@ -131,27 +154,25 @@ self.addEventListener("push", function (event) {
         actions: notifActions,
     };
 
-    event.waitUntil(
-        Promise.all([
-            // Show system notification
-            self.registration.showNotification(data.title || "Sonic2Life", options),
-            // Forward to open app windows for in-app banner
-            self.clients.matchAll({ type: "window", includeUncontrolled: true }).then(function (windowClients) {
-                windowClients.forEach(function (client) {
-                    client.postMessage({
-                        type: "push-notification",
-                        title: data.title || "Sonic2Life",
-                        body: data.body || "Reminder",
-                        tag: data.tag || "sonic2life",
-                        url: data.url || "/",
-                        notification_id: data.notification_id || "",
-                        actions: data.actions || [],
-                    });
+    return Promise.all([
+        // Show system notification
+        self.registration.showNotification(data.title || "Sonic2Life", options),
+        // Forward to open app windows for in-app banner
+        self.clients.matchAll({ type: "window", includeUncontrolled: true }).then(function (windowClients) {
+            windowClients.forEach(function (client) {
+                client.postMessage({
+                    type: "push-notification",
+                    title: data.title || "Sonic2Life",
+                    body: data.body || "Reminder",
+                    tag: data.tag || "sonic2life",
+                    url: data.url || "/",
+                    notification_id: data.notification_id || "",
+                    actions: data.actions || [],
                 });
-            }),
-        ])
-    );
-});
+            });
+        }),
+    ]);
+}
 
 // ── Notification click: handle action + send response to server ──────
 self.addEventListener("notificationclick", function (event) {
@@ -0,0 +1,27 @@
+"""Shared boto3 session and clients for the tools.
+
+Creating a boto3 client loads the service model from disk and sets up
+credential/endpoint resolvers, so each client is built once at import and
+reused; botocore clients are thread-safe.
+"""
+
+import boto3
+from botocore.config import Config
+
+from app.config import AWS_REGION
+
+# Keep-alive HTTPS pool shared across calls (TCP keepalive keeps idle TLS
+# sessions alive between sparse tool calls); fail fast on connect, but give
+# vision replies time to generate; standard retries, 3 attempts
+CLIENT_CONFIG = Config(
+    max_pool_connections=20,
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30,
+    retries={"max_attempts": 3, "mode": "standard"},
+)
+
+SESSION = boto3.session.Session(region_name=AWS_REGION)
+
+sns_client = SESSION.client("sns", config=CLIENT_CONFIG)
+bedrock_runtime_client = SESSION.client("bedrock-runtime", config=CLIENT_CONFIG)
@@ -1,13 +1,34 @@
 """Emergency Contacts Tool – manage emergency contacts for the user."""
 
-import json
 import logging
+import sqlite3
 
 from strands import tool
-from app.tools.database import get_db
+from app.tools.database import close_db, get_db
+from app.tools.envelope import dumps
 
 logger = logging.getLogger(__name__)
 
+# Name matching uses COLLATE NOCASE (not LOWER()) so idx_contacts_active_name applies
+_FIND_ACTIVE_SQL = (
+    "SELECT id, name, fullname, relationship, phone FROM emergency_contacts "
+    "WHERE active = 1 AND name = ? COLLATE NOCASE"
+)
+_INSERT_SQL = (
+    "INSERT INTO emergency_contacts (name, fullname, relationship, phone) VALUES (?, ?, ?, ?)"
+)
+_SEARCH_SQL = """SELECT id, name, fullname, relationship, phone
+               FROM emergency_contacts
+               WHERE active = 1 AND name LIKE ?
+               ORDER BY name"""
+_LIST_SQL = """SELECT id, name, fullname, relationship, phone
+               FROM emergency_contacts
+               WHERE active = 1
+               ORDER BY name"""
+_DEACTIVATE_SQL = (
+    "UPDATE emergency_contacts SET active = 0 WHERE active = 1 AND name = ? COLLATE NOCASE"
+)
+
 
 @tool
 def add_emergency_contact(
@@ -28,33 +49,23 @@ def add_emergency_contact(
         Confirmation message with contact details.
     """
     db = get_db()
-
-    # Check for duplicate by name
-    existing = db.execute(
-        "SELECT id FROM emergency_contacts WHERE LOWER(name) = LOWER(?) AND active = 1",
-        (name,),
-    ).fetchone()
-
-    if existing:
-        db.close()
-        return json.dumps({
+    try:
+        # uq_contact_name_active rejects a second active contact with this name
+        with db:
+            db.execute(_INSERT_SQL, (name, fullname, relationship, phone))
+    except sqlite3.IntegrityError:
+        return dumps({
             "success": False,
             "message": f"Contact '{name}' already exists. Use update or remove first.",
-        }, ensure_ascii=False)
-
-    db.execute(
-        """INSERT INTO emergency_contacts (name, fullname, relationship, phone)
-           VALUES (?, ?, ?, ?)""",
-        (name, fullname, relationship, phone),
-    )
-    db.commit()
-    db.close()
+        })
+    finally:
+        close_db(db)
 
     logger.info(f"📞 Emergency contact added: {name} ({relationship}) {phone}")
-    return json.dumps({
+    return dumps({
         "success": True,
         "message": f"Emergency contact added: {name} ({relationship}) — {phone}",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -69,40 +80,31 @@ def get_emergency_contacts(name: str = "") -> str:
     """
     db = get_db()
 
+    # LIKE is already case-insensitive for ASCII
     if name:
-        rows = db.execute(
-            """SELECT id, name, fullname, relationship, phone
-               FROM emergency_contacts
-               WHERE active = 1 AND LOWER(name) LIKE LOWER(?)
-               ORDER BY name""",
-            (f"%{name}%",),
-        ).fetchall()
+        rows = db.execute(_SEARCH_SQL, (f"%{name}%",)).fetchall()
     else:
-        rows = db.execute(
-            """SELECT id, name, fullname, relationship, phone
-               FROM emergency_contacts
-               WHERE active = 1
-               ORDER BY name"""
-        ).fetchall()
+        rows = db.execute(_LIST_SQL).fetchall()
 
-    db.close()
+    close_db(db)
 
+    # Unpack positionally (columns as in _SEARCH_SQL/_LIST_SQL) rather than by name
     contacts = [
         {
-            "name": r["name"],
-            "fullname": r["fullname"] or r["name"],
-            "relationship": r["relationship"] or "not specified",
-            "phone": r["phone"],
+            "name": contact_name,
+            "fullname": fullname or contact_name,
+            "relationship": relationship or "not specified",
+            "phone": phone,
         }
-        for r in rows
+        for _id, contact_name, fullname, relationship, phone in rows
     ]
 
     if not contacts:
         msg = f"No emergency contact found matching '{name}'." if name else "No emergency contacts saved yet."
-        return json.dumps({"contacts": [], "message": msg}, ensure_ascii=False)
+        return dumps({"contacts": [], "message": msg})
 
     logger.info(f"📞 Retrieved {len(contacts)} emergency contact(s)")
-    return json.dumps({"contacts": contacts}, ensure_ascii=False)
+    return dumps({"contacts": contacts})
 
 
 @tool
@@ -116,25 +118,21 @@ def remove_emergency_contact(name: str) -> str:
         Confirmation message.
     """
     db = get_db()
-    result = db.execute(
-        "UPDATE emergency_contacts SET active = 0 WHERE LOWER(name) = LOWER(?) AND active = 1",
-        (name,),
-    )
-    db.commit()
-    affected = result.rowcount
-    db.close()
+    with db:
+        affected = db.execute(_DEACTIVATE_SQL, (name,)).rowcount
+    close_db(db)
 
     if affected == 0:
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"No active emergency contact found with name '{name}'.",
-        }, ensure_ascii=False)
+        })
 
     logger.info(f"📞 Emergency contact removed: {name}")
-    return json.dumps({
+    return dumps({
         "success": True,
         "message": f"Emergency contact '{name}' has been removed.",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -157,17 +155,14 @@ def update_emergency_contact(
     """
     db = get_db()
 
-    existing = db.execute(
-        "SELECT id, name, fullname, relationship, phone FROM emergency_contacts WHERE LOWER(name) = LOWER(?) AND active = 1",
-        (name,),
-    ).fetchone()
+    existing = db.execute(_FIND_ACTIVE_SQL, (name,)).fetchone()
 
     if not existing:
-        db.close()
-        return json.dumps({
+        close_db(db)
+        return dumps({
             "success": False,
             "message": f"No active emergency contact found with name '{name}'.",
-        }, ensure_ascii=False)
+        })
 
     updates = []
     params = []
@@ -182,22 +177,19 @@ def update_emergency_contact(
         params.append(new_relationship)
 
     if not updates:
-        db.close()
-        return json.dumps({
+        close_db(db)
+        return dumps({
             "success": False,
             "message": "No changes specified. Provide new_phone, new_fullname, or new_relationship.",
-        }, ensure_ascii=False)
+        })
 
     params.append(existing["id"])
-    db.execute(
-        f"UPDATE emergency_contacts SET {', '.join(updates)} WHERE id = ?",
-        params,
-    )
-    db.commit()
-    db.close()
+    with db:
+        db.execute(f"UPDATE emergency_contacts SET {', '.join(updates)} WHERE id = ?", params)
+    close_db(db)
 
     logger.info(f"📞 Emergency contact updated: {name}")
-    return json.dumps({
+    return dumps({
         "success": True,
         "message": f"Emergency contact '{name}' updated successfully.",
-    }, ensure_ascii=False)
+    })
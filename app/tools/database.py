@@ -1,32 +1,117 @@
 """SQLite database initialization and access for Sonic2Life."""
 
+import re
 import sqlite3
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 from app.config import DATABASE_PATH
 
 logger = logging.getLogger(__name__)
 
 _db_initialized = False
+_init_lock = threading.Lock()
+_fts_enabled = False
+
+# FTS5 shadow tables for name/title lookups: (fts table, content table, column)
+_FTS_TABLES = (
+    ("contacts_fts", "emergency_contacts", "name"),
+    ("medications_fts", "medications", "name"),
+    ("events_fts", "events", "title"),
+)
+
+# Idle connections kept open for get_conn(); extra borrowers get a fresh
+# connection that is closed instead of pooled when returned
+POOL_SIZE = 4
+_pool: list[sqlite3.Connection] = []
+_pool_lock = threading.Lock()
+
+
+def _configure(conn: sqlite3.Connection):
+    """Apply the per-connection settings shared by get_db() and the pool."""
+    conn.row_factory = sqlite3.Row
+    # WAL + NORMAL: commits don't fsync, only checkpoints do
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Wait for a competing writer instead of failing with 'database is locked'
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # Serve reads from a 256 MB memory map instead of read() syscalls
+    conn.execute("PRAGMA mmap_size=268435456")
+    # Negative = KiB, so ~20 MB of page cache regardless of page size
+    conn.execute("PRAGMA cache_size=-20000")
+    # Bound the ANALYZE work PRAGMA optimize may do in close_db()
+    conn.execute("PRAGMA analysis_limit=400")
 
 
 def get_db() -> sqlite3.Connection:
     """Get a SQLite connection, creating tables if needed."""
-    global _db_initialized
     conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    _configure(conn)
+    _ensure_initialized(conn)
+    return conn
 
-    if not _db_initialized:
-        _init_tables(conn)
-        _db_initialized = True
 
+def open_db() -> sqlite3.Connection:
+    """Open a long-lived connection (usable from any thread); caller closes it."""
+    # Long-lived, so a larger prepared-statement cache pays off
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, cached_statements=256)
+    _configure(conn)
+    conn.execute("PRAGMA cache_size=-65536")
+    _ensure_initialized(conn)
     return conn
 
 
+def _ensure_initialized(conn: sqlite3.Connection):
+    """Run schema setup once per process, even if first connects race."""
+    global _db_initialized
+    if _db_initialized:
+        return
+    with _init_lock:
+        if not _db_initialized:
+            _init_tables(conn)
+            _db_initialized = True
+
+
+def close_db(conn: sqlite3.Connection):
+    """Close a connection, letting SQLite refresh planner statistics first."""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ PRAGMA optimize failed: {e}")
+    conn.close()
+
+
+@contextmanager
+def get_conn() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled SQLite connection; it goes back to the pool on exit.
+
+    Uncommitted changes are rolled back on return, so callers must commit.
+    """
+    with _pool_lock:
+        conn = _pool.pop() if _pool else None
+    if conn is None:
+        conn = open_db()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        with _pool_lock:
+            if len(_pool) < POOL_SIZE:
+                _pool.append(conn)
+                conn = None
+        if conn is not None:
+            close_db(conn)
+
+
 def _init_tables(conn: sqlite3.Connection):
     """Create all tables if they don't exist."""
+    # journal_mode is persisted in the database file, so once per process is enough
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.executescript("""
         -- Medication schedule
         CREATE TABLE IF NOT EXISTS medications (
@@ -39,6 +124,18 @@ def _init_tables(conn: sqlite3.Connection):
             active INTEGER DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        -- Keep days lower-case with no spaces, so ',' || days || ',' LIKE '%,mon,%'
+        -- is an exact membership test whoever writes the row
+        CREATE TRIGGER IF NOT EXISTS medications_days_ai AFTER INSERT ON medications
+        WHEN new.days <> lower(replace(new.days, ' ', '')) BEGIN
+            UPDATE medications SET days = lower(replace(days, ' ', '')) WHERE id = new.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS medications_days_au AFTER UPDATE OF days ON medications
+        WHEN new.days <> lower(replace(new.days, ' ', '')) BEGIN
+            UPDATE medications SET days = lower(replace(days, ' ', '')) WHERE id = new.id;
+        END;
+        UPDATE medications SET days = lower(replace(days, ' ', ''))
+        WHERE days <> lower(replace(days, ' ', ''));
 
         -- Medication log (when taken)
         CREATE TABLE IF NOT EXISTS medication_log (
@@ -48,6 +145,12 @@ def _init_tables(conn: sqlite3.Connection):
             confirmed_by TEXT DEFAULT 'voice',
             FOREIGN KEY (medication_id) REFERENCES medications(id)
         );
+        -- (active, schedule_time) covers the old active-only index
+        DROP INDEX IF EXISTS idx_meds_active;
+        CREATE INDEX IF NOT EXISTS idx_meds_active_time ON medications(active, schedule_time);
+        CREATE INDEX IF NOT EXISTS idx_medlog_med_taken ON medication_log(medication_id, taken_at);
+        -- get_medication_history without a name: range + ORDER BY taken_at
+        CREATE INDEX IF NOT EXISTS idx_medlog_taken ON medication_log(taken_at);
 
         -- Notification responses (persisted)
         CREATE TABLE IF NOT EXISTS notification_responses (
@@ -57,15 +160,25 @@ def _init_tables(conn: sqlite3.Connection):
             source TEXT DEFAULT 'banner',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        CREATE INDEX IF NOT EXISTS idx_notif_resp_created
+            ON notification_responses(created_at DESC);
+        -- Keep only the newest 1000 responses (ids are monotonic, so this is a rowid range delete)
+        CREATE TRIGGER IF NOT EXISTS notif_resp_gc AFTER INSERT ON notification_responses
+        BEGIN
+            DELETE FROM notification_responses WHERE id <= NEW.id - 1000;
+        END;
 
         -- Medication snoozes
         CREATE TABLE IF NOT EXISTS medication_snoozes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             medication_id INTEGER NOT NULL,
-            snooze_until TIMESTAMP NOT NULL,
+            snooze_until INTEGER NOT NULL,   -- unix epoch seconds
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (medication_id) REFERENCES medications(id)
         );
+        CREATE INDEX IF NOT EXISTS idx_medsnooze_medid_until
+            ON medication_snoozes(medication_id, snooze_until DESC);
+        CREATE INDEX IF NOT EXISTS idx_snoozes_until ON medication_snoozes(snooze_until, medication_id);
 
         -- User memory/preferences
         CREATE TABLE IF NOT EXISTS memory (
@@ -74,6 +187,9 @@ def _init_tables(conn: sqlite3.Connection):
             category TEXT DEFAULT 'preference',
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        -- recall: serves WHERE category = ? ORDER BY key and ORDER BY category, key
+        -- straight from the index, no sort step
+        CREATE INDEX IF NOT EXISTS idx_memory_cat_key ON memory(category, key);
 
         -- Admin settings (runtime configuration, overrides env vars)
         CREATE TABLE IF NOT EXISTS settings (
@@ -86,9 +202,7 @@ def _init_tables(conn: sqlite3.Connection):
         -- Push notification subscriptions
         CREATE TABLE IF NOT EXISTS push_subscriptions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            endpoint TEXT NOT NULL UNIQUE,
-            keys_p256dh TEXT NOT NULL,
-            keys_auth TEXT NOT NULL,
+            endpoint TEXT NOT NULL UNIQUE,  -- UNIQUE doubles as the lookup index
             subscription_json TEXT NOT NULL,  -- full JSON for pywebpush
             user_agent TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -109,6 +223,10 @@ def _init_tables(conn: sqlite3.Connection):
             active INTEGER DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        CREATE INDEX IF NOT EXISTS idx_events_active_notified ON events(active, notified);
+        CREATE INDEX IF NOT EXISTS idx_events_brief
+            ON events(active, morning_brief, brief_sent, event_time);
+        CREATE INDEX IF NOT EXISTS idx_events_active_time ON events(active, event_time);
 
         -- Emergency contacts
         CREATE TABLE IF NOT EXISTS emergency_contacts (
@@ -120,6 +238,9 @@ def _init_tables(conn: sqlite3.Connection):
             active INTEGER DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        CREATE INDEX IF NOT EXISTS idx_contacts_active_name
+            ON emergency_contacts(active, name COLLATE NOCASE);
+
         -- SMS log (sent messages via Amazon SNS)
         CREATE TABLE IF NOT EXISTS sms_log (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -134,11 +255,80 @@ def _init_tables(conn: sqlite3.Connection):
             FOREIGN KEY (contact_id) REFERENCES emergency_contacts(id)
         );
     """)
+    # At most one active contact per name (case-insensitive); add_emergency_contact
+    # relies on the IntegrityError. Older databases may hold duplicates (the admin
+    # API never checked), so soft-delete all but the oldest first.
+    deduped = conn.execute(
+        "UPDATE emergency_contacts SET active = 0 WHERE active = 1 AND id NOT IN ("
+        "SELECT min(id) FROM emergency_contacts WHERE active = 1 GROUP BY name COLLATE NOCASE)"
+    ).rowcount
+    if deduped:
+        logger.warning("⚠️ Deactivated %d duplicate active contact(s)", deduped)
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_contact_name_active "
+        "ON emergency_contacts(name COLLATE NOCASE) WHERE active = 1"
+    )
+    _init_fts(conn)
+    # Snoozes used to be stored as local ISO strings; convert them to epoch
+    conn.execute(
+        "UPDATE medication_snoozes SET snooze_until = CAST(strftime('%s', snooze_until, 'utc') AS INTEGER) "
+        "WHERE typeof(snooze_until) = 'text'"
+    )
+    # The p256dh/auth keys used to be duplicated outside subscription_json
+    push_columns = {row[1] for row in conn.execute("PRAGMA table_info(push_subscriptions)")}
+    for column in ("keys_p256dh", "keys_auth"):
+        if column in push_columns:
+            conn.execute(f"ALTER TABLE push_subscriptions DROP COLUMN {column}")
     _seed_default_settings(conn)
     conn.commit()
     logger.info("✅ Database tables initialized")
 
 
+def _init_fts(conn: sqlite3.Connection):
+    """Create the FTS5 lookup tables and their sync triggers (if SQLite has FTS5)."""
+    global _fts_enabled
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    try:
+        for fts, table, column in _FTS_TABLES:
+            conn.executescript(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    {column}, content='{table}', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});
+                    INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+                END;
+            """)
+            # Index rows that existed before the FTS table did
+            if fts not in existing:
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        logger.warning(f"⚠️ FTS5 not available, name lookups use LIKE only: {e}")
+        return
+    _fts_enabled = True
+
+
+def fts_query(text: str) -> str | None:
+    """Turn free text into an FTS5 prefix query ('asp' → '"asp"*').
+
+    Returns None when FTS5 is unavailable or the text has no searchable
+    tokens; callers then fall back to LIKE.
+    """
+    if not _fts_enabled:
+        return None
+    tokens = re.findall(r"\w+", text)
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
 def _seed_default_settings(conn: sqlite3.Connection):
     """Insert default settings if they don't exist yet."""
     defaults = [
@@ -155,8 +345,7 @@ def _seed_default_settings(conn: sqlite3.Connection):
         ("notification_advance_minutes", "60", "Default minutes before event to notify"),
         ("system_prompt", "", "Custom system prompt override (empty = use default)"),
     ]
-    for key, value, desc in defaults:
-        conn.execute(
-            "INSERT OR IGNORE INTO settings (key, value, description) VALUES (?, ?, ?)",
-            (key, value, desc),
-        )
+    conn.executemany(
+        "INSERT OR IGNORE INTO settings (key, value, description) VALUES (?, ?, ?)",
+        defaults,
+    )
@@ -0,0 +1,25 @@
+"""JSON encoding/decoding for the tools.
+
+Tools answer the agent with small JSON envelopes on every call and parse
+upstream API responses; orjson handles both natively (UTF-8 in and out,
+no ensure_ascii pass, bytes accepted) when available.
+"""
+
+import json
+
+try:
+    import orjson  # optional: faster tool result serialization
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+else:
+    def dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    loads = json.loads  # also accepts UTF-8 bytes
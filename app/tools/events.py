@@ -1,14 +1,88 @@
 """Event / Calendar Manager – CRUD operations for appointments, reminders, and scheduled events."""
 
-import json
 import logging
 from datetime import datetime, timedelta
 
 from strands import tool
-from app.tools.database import get_db
+from app.tools.database import fts_query, get_conn
+from app.tools.envelope import dumps
 
 logger = logging.getLogger(__name__)
 
+# Index = datetime.weekday(); matches the stored medications.days tokens
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Last get_todays_schedule() result as ((schedule version, date), json);
+# every medication/event write bumps the version via notify_scheduler()
+_todays_cache: tuple[tuple[int, str], str] | None = None
+
+# Today's events and medications as one timeline. Event times are sliced
+# from the stored ISO string (local wall-clock, no UTC conversion); meds
+# are zero-padded so "9:00" sorts before "10:00". Day membership matches
+# ",mon," against the comma-wrapped days column (normalized on write).
+_TODAYS_SCHEDULE_SQL = """
+    SELECT substr(event_time, 12, 5) AS time, 'event' AS type,
+           title, COALESCE(description, '') AS description
+    FROM events
+    WHERE active = 1 AND event_time >= ? AND event_time < ?
+    UNION ALL
+    SELECT substr('0' || schedule_time, -5), 'medication',
+           '💊 ' || name,
+           trim(COALESCE(dosage, '') || ' ' || COALESCE(notes, ''))
+    FROM medications
+    WHERE active = 1
+      AND (',' || days || ',') LIKE ?
+    ORDER BY 1
+"""
+
+# Returns (row count, finished JSON envelope); the subquery fixes array order.
+# Bounds are bound as local ISO strings (the stored format), so the range is a
+# plain text comparison served by idx_events_active_time
+_UPCOMING_SQL = """
+    SELECT count(*), json_object(
+        'events', json_group_array(json_object(
+            'id', id, 'title', title, 'description', COALESCE(description, ''),
+            'event_time', event_time, 'reminder_minutes_before', reminder_minutes,
+            'morning_brief', json(CASE WHEN morning_brief THEN 'true' ELSE 'false' END)
+        )),
+        'days_ahead', ?
+    )
+    FROM (
+        SELECT id, title, description, event_time, reminder_minutes, morning_brief
+        FROM events
+        WHERE active = 1 AND event_time BETWEEN ? AND ?
+        ORDER BY event_time
+    )
+"""
+_INSERT_SQL = (
+    "INSERT INTO events (title, description, event_time, reminder_minutes, morning_brief) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+# Title lookups: FTS prefix match first, substring LIKE only if that misses.
+# Each UPDATE comes as an (fts, like) pair of complete statements.
+_BY_TITLE_FTS = "active = 1 AND id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)"
+_BY_TITLE_LIKE = "title LIKE ? AND active = 1"
+_CANCEL_SQL = tuple(
+    "UPDATE events SET active = 0 WHERE " + where for where in (_BY_TITLE_FTS, _BY_TITLE_LIKE)
+)
+# Reset notification flags since time changed
+_RESCHEDULE_SQL = tuple(
+    "UPDATE events SET event_time = ?, notified = 0, brief_sent = 0 WHERE " + where
+    for where in (_BY_TITLE_FTS, _BY_TITLE_LIKE)
+)
+
+
+def _update_by_title(db, sql: tuple[str, str], params: tuple, event_title: str) -> int:
+    """Run an UPDATE against events matching event_title; returns affected rows."""
+    fts_sql, like_sql = sql
+    query = fts_query(event_title)
+    if query:
+        affected = db.execute(fts_sql, (*params, query)).rowcount
+        if affected:
+            return affected
+    return db.execute(like_sql, (*params, f"%{event_title}%")).rowcount
+
 
 @tool
 def get_upcoming_events(days: int = 7) -> str:
@@ -20,35 +94,21 @@ def get_upcoming_events(days: int = 7) -> str:
     Returns:
         JSON list of upcoming events with title, time, description, and reminder info.
     """
-    db = get_db()
-    rows = db.execute(
-        """SELECT id, title, description, event_time, reminder_minutes, morning_brief
-           FROM events
-           WHERE active = 1 AND event_time >= datetime('now') AND event_time <= datetime('now', ?)
-           ORDER BY event_time""",
-        (f"+{days} days",),
-    ).fetchall()
-    db.close()
-
-    if not rows:
-        return json.dumps({
+    now = datetime.now()
+    start = now.isoformat(timespec="seconds")
+    end = (now + timedelta(days=days)).isoformat(timespec="seconds")
+
+    with get_conn() as db:
+        count, result = db.execute(_UPCOMING_SQL, (days, start, end)).fetchone()
+
+    if not count:
+        return dumps({
             "events": [],
             "message": f"No events scheduled for the next {days} days.",
-        }, ensure_ascii=False)
-
-    events = []
-    for r in rows:
-        events.append({
-            "id": r["id"],
-            "title": r["title"],
-            "description": r["description"] or "",
-            "event_time": r["event_time"],
-            "reminder_minutes_before": r["reminder_minutes"],
-            "morning_brief": bool(r["morning_brief"]),
         })
 
-    logger.info(f"📅 Returning {len(events)} upcoming events")
-    return json.dumps({"events": events, "days_ahead": days}, ensure_ascii=False)
+    logger.info("📅 Returning %d upcoming events", count)
+    return result
 
 
 @tool
@@ -58,62 +118,39 @@ def get_todays_schedule() -> str:
     Returns:
         JSON with today's events and medications combined into a timeline.
     """
-    db = get_db()
-    today = datetime.now().strftime("%Y-%m-%d")
-    current_day = datetime.now().strftime("%a").lower()
-
-    # Get today's events
-    events = db.execute(
-        """SELECT id, title, description, event_time, reminder_minutes
-           FROM events
-           WHERE active = 1 AND date(event_time) = ?
-           ORDER BY event_time""",
-        (today,),
-    ).fetchall()
-
-    # Get today's medications (filter by day of week)
-    meds = db.execute(
-        "SELECT id, name, dosage, schedule_time, days, notes FROM medications WHERE active = 1 ORDER BY schedule_time"
-    ).fetchall()
-
-    db.close()
-
-    timeline = []
-
-    for e in events:
-        try:
-            dt = datetime.fromisoformat(e["event_time"])
-            time_str = dt.strftime("%H:%M")
-        except Exception:
-            time_str = "?"
-        timeline.append({
-            "time": time_str,
-            "type": "event",
-            "title": e["title"],
-            "description": e["description"] or "",
-        })
-
-    for m in meds:
-        # Check if today is a scheduled day for this medication
-        med_days = [d.strip() for d in (m["days"] or "").split(",")]
-        if current_day not in med_days:
-            continue
-        timeline.append({
-            "time": m["schedule_time"],
-            "type": "medication",
-            "title": f"💊 {m['name']}",
-            "description": f"{m['dosage'] or ''} {m['notes'] or ''}".strip(),
-        })
-
-    # Sort by time
-    timeline.sort(key=lambda x: x["time"])
-
-    logger.info(f"📅 Today's schedule: {len(timeline)} items")
-    return json.dumps({
+    global _todays_cache
+    from app.scheduler import schedule_version
+
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    # Read the version before querying, so a write racing the query forces a refresh
+    key = (schedule_version(), today)
+    cached = _todays_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
+    day_pattern = f"%,{_WEEKDAYS[now.weekday()]},%"
+
+    with get_conn() as db:
+        rows = db.execute(
+            _TODAYS_SCHEDULE_SQL, (today, tomorrow, day_pattern)
+        ).fetchall()
+
+    # Unpack positionally (columns as in _TODAYS_SCHEDULE_SQL) rather than by name
+    timeline = [
+        {"time": time_str or "?", "type": kind, "title": title, "description": description}
+        for time_str, kind, title, description in rows
+    ]
+
+    logger.info("📅 Today's schedule: %d items", len(timeline))
+    result = dumps({
         "date": today,
-        "day": datetime.now().strftime("%A"),
+        "day": now.strftime("%A"),
         "schedule": timeline,
-    }, ensure_ascii=False)
+    })
+    _todays_cache = (key, result)
+    return result
 
 
 @tool
@@ -130,36 +167,30 @@ def add_event(title: str, event_time: str, description: str = "", reminder_minut
     Returns:
         Confirmation message.
     """
-    # Parse and validate the time
+    # Parse and validate the time (fromisoformat accepts "YYYY-MM-DD HH:MM" on 3.11+)
     try:
-        dt = datetime.strptime(event_time, "%Y-%m-%d %H:%M")
-        iso_time = dt.isoformat()
+        iso_time = datetime.fromisoformat(event_time).isoformat()
     except ValueError:
-        try:
-            # Try ISO format directly
-            dt = datetime.fromisoformat(event_time)
-            iso_time = dt.isoformat()
-        except ValueError:
-            return json.dumps({
-                "success": False,
-                "message": f"Invalid date/time format: '{event_time}'. Use 'YYYY-MM-DD HH:MM' format.",
-            }, ensure_ascii=False)
-
-    db = get_db()
-    cursor = db.execute(
-        "INSERT INTO events (title, description, event_time, reminder_minutes, morning_brief) VALUES (?, ?, ?, ?, ?)",
-        (title, description, iso_time, reminder_minutes, 1 if morning_brief else 0),
-    )
-    db.commit()
-    event_id = cursor.lastrowid
-    db.close()
+        return dumps({
+            "success": False,
+            "message": f"Invalid date/time format: '{event_time}'. Use 'YYYY-MM-DD HH:MM' format.",
+        })
 
-    logger.info(f"📅 Added event: {title} at {event_time}")
-    return json.dumps({
+    with get_conn() as db:
+        cursor = db.execute(
+            _INSERT_SQL, (title, description, iso_time, reminder_minutes, 1 if morning_brief else 0)
+        )
+        db.commit()
+        event_id = cursor.lastrowid
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
+
+    logger.info("📅 Added event: %s at %s", title, event_time)
+    return dumps({
         "success": True,
         "id": event_id,
         "message": f"Event '{title}' scheduled for {event_time}. Reminder will be sent {reminder_minutes} minutes before.",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -172,26 +203,24 @@ def cancel_event(event_title: str) -> str:
     Returns:
         Confirmation message.
     """
-    db = get_db()
-    result = db.execute(
-        "UPDATE events SET active = 0 WHERE title LIKE ? AND active = 1",
-        (f"%{event_title}%",),
-    )
-    db.commit()
-    affected = result.rowcount
-    db.close()
+    with get_conn() as db:
+        affected = _update_by_title(db, _CANCEL_SQL, (), event_title)
+        db.commit()
 
     if affected == 0:
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"No active event found matching '{event_title}'.",
-        }, ensure_ascii=False)
+        })
+
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
 
-    logger.info(f"📅 Cancelled event: {event_title}")
-    return json.dumps({
+    logger.info("📅 Cancelled event: %s", event_title)
+    return dumps({
         "success": True,
         "message": f"Event '{event_title}' has been cancelled.",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -206,36 +235,27 @@ def update_event_time(event_title: str, new_time: str) -> str:
         Confirmation message.
     """
     try:
-        dt = datetime.strptime(new_time, "%Y-%m-%d %H:%M")
-        iso_time = dt.isoformat()
+        iso_time = datetime.fromisoformat(new_time).isoformat()
     except ValueError:
-        try:
-            dt = datetime.fromisoformat(new_time)
-            iso_time = dt.isoformat()
-        except ValueError:
-            return json.dumps({
-                "success": False,
-                "message": f"Invalid date/time format: '{new_time}'. Use 'YYYY-MM-DD HH:MM'.",
-            }, ensure_ascii=False)
-
-    db = get_db()
-    # Reset notification flags since time changed
-    result = db.execute(
-        "UPDATE events SET event_time = ?, notified = 0, brief_sent = 0 WHERE title LIKE ? AND active = 1",
-        (iso_time, f"%{event_title}%"),
-    )
-    db.commit()
-    affected = result.rowcount
-    db.close()
+        return dumps({
+            "success": False,
+            "message": f"Invalid date/time format: '{new_time}'. Use 'YYYY-MM-DD HH:MM'.",
+        })
+
+    with get_conn() as db:
+        affected = _update_by_title(db, _RESCHEDULE_SQL, (iso_time,), event_title)
+        db.commit()
 
     if affected == 0:
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"No active event found matching '{event_title}'.",
-        }, ensure_ascii=False)
+        })
 
-    logger.info(f"📅 Rescheduled event: {event_title} to {new_time}")
-    return json.dumps({
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
+    logger.info("📅 Rescheduled event: %s to %s", event_title, new_time)
+    return dumps({
         "success": True,
         "message": f"Event '{event_title}' rescheduled to {new_time}.",
-    }, ensure_ascii=False)
+    })
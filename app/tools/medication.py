@@ -1,14 +1,63 @@
 """Medication Manager – CRUD operations for medication schedule and logging."""
 
-import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from strands import tool
-from app.tools.database import get_db
+from app.tools.database import fts_query, get_conn
+from app.tools.envelope import dumps
 
 logger = logging.getLogger(__name__)
 
+# Empty-schedule answer, encoded once: it is what get_medication_schedule()
+# caches and returns on every call while no medications are set up
+_MSG_NO_MEDICATIONS = dumps({"medications": [], "message": "No medications scheduled."})
+
+# Last get_medication_schedule() result as (schedule version, json); every
+# medication/event write bumps the version via notify_scheduler()
+_schedule_cache: tuple[int, str] | None = None
+
+# Read queries return (row count, finished JSON envelope); subqueries fix array order
+_SCHEDULE_SQL = """
+    SELECT count(*), json_object('medications', json_group_array(json_object(
+        'id', id, 'name', name, 'dosage', dosage, 'time', schedule_time,
+        'days', days, 'notes', notes
+    )))
+    FROM (
+        SELECT id, name, dosage, schedule_time, days, notes FROM medications
+        WHERE active = 1 ORDER BY schedule_time
+    )
+"""
+_INSERT_SQL = "INSERT INTO medications (name, dosage, schedule_time, days, notes) VALUES (?, ?, ?, ?, ?)"
+_LOG_TAKEN_SQL = "INSERT INTO medication_log (medication_id, confirmed_by) VALUES (?, 'voice')"
+_HISTORY_TEMPLATE = """
+    SELECT count(*), json_object(
+        'history', json_group_array(json_object('name', name, 'taken_at', taken_at)),
+        'days', ?
+    )
+    FROM (
+        SELECT m.name, ml.taken_at
+        FROM medication_log ml
+        JOIN medications m ON ml.medication_id = m.id
+        WHERE {name_filter}ml.taken_at >= ?
+        ORDER BY ml.taken_at DESC
+    )
+"""
+_HISTORY_SQL = _HISTORY_TEMPLATE.format(name_filter="")
+_HISTORY_BY_NAME_SQL = _HISTORY_TEMPLATE.format(name_filter="m.name LIKE ? AND ")
+
+# Name lookups: FTS prefix match first, substring LIKE only if that misses
+_FIND_FTS_SQL = (
+    "SELECT m.id, m.name FROM medications_fts f JOIN medications m ON m.id = f.rowid "
+    "WHERE medications_fts MATCH ? AND m.active = 1 ORDER BY f.rank"
+)
+_FIND_LIKE_SQL = "SELECT id, name FROM medications WHERE name LIKE ? AND active = 1"
+_DEACTIVATE_FTS_SQL = (
+    "UPDATE medications SET active = 0 WHERE active = 1 "
+    "AND id IN (SELECT rowid FROM medications_fts WHERE medications_fts MATCH ?)"
+)
+_DEACTIVATE_LIKE_SQL = "UPDATE medications SET active = 0 WHERE name LIKE ? AND active = 1"
+
 
 @tool
 def get_medication_schedule() -> str:
@@ -17,28 +66,24 @@ def get_medication_schedule() -> str:
     Returns:
         JSON list of medications with name, dosage, schedule_time, and days.
     """
-    db = get_db()
-    rows = db.execute(
-        "SELECT id, name, dosage, schedule_time, days, notes FROM medications WHERE active = 1 ORDER BY schedule_time"
-    ).fetchall()
-    db.close()
-
-    if not rows:
-        return json.dumps({"medications": [], "message": "No medications scheduled."}, ensure_ascii=False)
-
-    meds = []
-    for r in rows:
-        meds.append({
-            "id": r["id"],
-            "name": r["name"],
-            "dosage": r["dosage"],
-            "time": r["schedule_time"],
-            "days": r["days"],
-            "notes": r["notes"],
-        })
+    global _schedule_cache
+    from app.scheduler import schedule_version
 
-    logger.info(f"💊 Returning {len(meds)} medications")
-    return json.dumps({"medications": meds}, ensure_ascii=False)
+    # Read the version before querying, so a write racing the query forces a refresh
+    version = schedule_version()
+    cached = _schedule_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with get_conn() as db:
+        count, result = db.execute(_SCHEDULE_SQL).fetchone()
+
+    if not count:
+        result = _MSG_NO_MEDICATIONS
+    else:
+        logger.info("💊 Returning %d medications", count)
+    _schedule_cache = (version, result)
+    return result
 
 
 @tool
@@ -55,19 +100,17 @@ def add_medication(name: str, schedule_time: str, dosage: str = "", days: str =
     Returns:
         Confirmation message.
     """
-    db = get_db()
-    db.execute(
-        "INSERT INTO medications (name, dosage, schedule_time, days, notes) VALUES (?, ?, ?, ?, ?)",
-        (name, dosage, schedule_time, days, notes),
-    )
-    db.commit()
-    db.close()
-
-    logger.info(f"💊 Added medication: {name} at {schedule_time}")
-    return json.dumps({
+    with get_conn() as db:
+        db.execute(_INSERT_SQL, (name, dosage, schedule_time, days, notes))
+        db.commit()
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
+
+    logger.info("💊 Added medication: %s at %s", name, schedule_time)
+    return dumps({
         "success": True,
         "message": f"Medication '{name}' added at {schedule_time}.",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -80,35 +123,31 @@ def confirm_medication_taken(medication_name: str) -> str:
     Returns:
         Confirmation message.
     """
-    db = get_db()
-
-    # Find the medication
-    row = db.execute(
-        "SELECT id, name FROM medications WHERE name LIKE ? AND active = 1",
-        (f"%{medication_name}%",),
-    ).fetchone()
-
-    if not row:
-        db.close()
-        return json.dumps({
-            "success": False,
-            "message": f"Medication '{medication_name}' not found in schedule.",
-        }, ensure_ascii=False)
-
-    # Log it
-    db.execute(
-        "INSERT INTO medication_log (medication_id, confirmed_by) VALUES (?, 'voice')",
-        (row["id"],),
-    )
-    db.commit()
-    db.close()
+    with get_conn() as db:
+        # Find the medication
+        row = None
+        query = fts_query(medication_name)
+        if query:
+            row = db.execute(_FIND_FTS_SQL, (query,)).fetchone()
+        if not row:
+            row = db.execute(_FIND_LIKE_SQL, (f"%{medication_name}%",)).fetchone()
+
+        if not row:
+            return dumps({
+                "success": False,
+                "message": f"Medication '{medication_name}' not found in schedule.",
+            })
+
+        # Log it
+        db.execute(_LOG_TAKEN_SQL, (row["id"],))
+        db.commit()
 
     now = datetime.now().strftime("%H:%M")
-    logger.info(f"💊 Confirmed: {row['name']} taken at {now}")
-    return json.dumps({
+    logger.info("💊 Confirmed: %s taken at %s", row["name"], now)
+    return dumps({
         "success": True,
         "message": f"Confirmed: {row['name']} taken at {now}.",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -121,26 +160,28 @@ def remove_medication(medication_name: str) -> str:
     Returns:
         Confirmation message.
     """
-    db = get_db()
-    result = db.execute(
-        "UPDATE medications SET active = 0 WHERE name LIKE ? AND active = 1",
-        (f"%{medication_name}%",),
-    )
-    db.commit()
-    affected = result.rowcount
-    db.close()
+    with get_conn() as db:
+        affected = 0
+        query = fts_query(medication_name)
+        if query:
+            affected = db.execute(_DEACTIVATE_FTS_SQL, (query,)).rowcount
+        if affected == 0:
+            affected = db.execute(_DEACTIVATE_LIKE_SQL, (f"%{medication_name}%",)).rowcount
+        db.commit()
 
     if affected == 0:
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"Medication '{medication_name}' not found.",
-        }, ensure_ascii=False)
+        })
 
-    logger.info(f"💊 Removed medication: {medication_name}")
-    return json.dumps({
+    from app.scheduler import notify_scheduler
+    notify_scheduler()
+    logger.info("💊 Removed medication: %s", medication_name)
+    return dumps({
         "success": True,
         "message": f"Medication '{medication_name}' removed from schedule.",
-    }, ensure_ascii=False)
+    })
 
 
 @tool
@@ -154,29 +195,16 @@ def get_medication_history(medication_name: str = "", days: int = 7) -> str:
     Returns:
         History of medication confirmations.
     """
-    db = get_db()
-
-    if medication_name:
-        rows = db.execute(
-            """SELECT m.name, ml.taken_at
-               FROM medication_log ml
-               JOIN medications m ON ml.medication_id = m.id
-               WHERE m.name LIKE ? AND ml.taken_at >= datetime('now', ?)
-               ORDER BY ml.taken_at DESC""",
-            (f"%{medication_name}%", f"-{days} days"),
-        ).fetchall()
-    else:
-        rows = db.execute(
-            """SELECT m.name, ml.taken_at
-               FROM medication_log ml
-               JOIN medications m ON ml.medication_id = m.id
-               WHERE ml.taken_at >= datetime('now', ?)
-               ORDER BY ml.taken_at DESC""",
-            (f"-{days} days",),
-        ).fetchall()
-    db.close()
-
-    history = [{"name": r["name"], "taken_at": r["taken_at"]} for r in rows]
-
-    logger.info(f"💊 History: {len(history)} entries")
-    return json.dumps({"history": history, "days": days}, ensure_ascii=False)
+    # taken_at is CURRENT_TIMESTAMP (UTC, "YYYY-MM-DD HH:MM:SS")
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    with get_conn() as db:
+        if medication_name:
+            count, result = db.execute(
+                _HISTORY_BY_NAME_SQL, (days, f"%{medication_name}%", since)
+            ).fetchone()
+        else:
+            count, result = db.execute(_HISTORY_SQL, (days, since)).fetchone()
+
+    logger.info("💊 History: %d entries", count)
+    return result
@@ -1,13 +1,31 @@
 """Memory Tool – persistent user preferences and remembered facts."""
 
-import json
 import logging
 
 from strands import tool
-from app.tools.database import get_db
+from app.tools.database import get_conn
+from app.tools.envelope import dumps
 
 logger = logging.getLogger(__name__)
 
+# Upsert binds (key, value, category) once; the update side reads excluded.*.
+# Kept as a constant so the connection's statement cache reuses it.
+_UPSERT_SQL = """INSERT INTO memory (key, value, category, updated_at)
+                 VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                 ON CONFLICT(key) DO UPDATE SET value = excluded.value,
+                     category = excluded.category, updated_at = CURRENT_TIMESTAMP"""
+_GET_SQL = "SELECT key, value, category FROM memory WHERE key = ?"
+# Returns (row count, finished JSON envelope); the subquery fixes array order
+_LIST_TEMPLATE = """
+    SELECT count(*), json_object('memories', json_group_array(json_object(
+        'key', key, 'value', value, 'category', category
+    )))
+    FROM (SELECT key, value, category FROM memory {where} ORDER BY {order})
+"""
+_LIST_BY_CATEGORY_SQL = _LIST_TEMPLATE.format(where="WHERE category = ?", order="key")
+_LIST_SQL = _LIST_TEMPLATE.format(where="", order="category, key")
+_DELETE_SQL = "DELETE FROM memory WHERE key = ?"
+
 
 @tool
 def remember(key: str, value: str, category: str = "preference") -> str:
@@ -21,21 +39,47 @@ def remember(key: str, value: str, category: str = "preference") -> str:
     Returns:
         Confirmation message.
     """
-    db = get_db()
-    db.execute(
-        """INSERT INTO memory (key, value, category, updated_at)
-           VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-           ON CONFLICT(key) DO UPDATE SET value = ?, category = ?, updated_at = CURRENT_TIMESTAMP""",
-        (key, value, category, value, category),
-    )
-    db.commit()
-    db.close()
-
-    logger.info(f"🧠 Remembered: {key} = {value} [{category}]")
-    return json.dumps({
+    with get_conn() as db:
+        db.execute(_UPSERT_SQL, (key, value, category))
+        db.commit()
+
+    logger.info("🧠 Remembered: %s = %s [%s]", key, value, category)
+    return dumps({
         "success": True,
         "message": f"Remembered: {key} = {value}",
-    }, ensure_ascii=False)
+    })
+
+
+@tool
+def remember_many(items: list[list[str]]) -> str:
+    """Remember several pieces of information about the user at once.
+
+    Args:
+        items: List of [key, value] or [key, value, category] entries,
+               e.g. [["favorite_color", "blue"], ["allergy", "penicillin", "health"]].
+               Category defaults to "preference".
+
+    Returns:
+        Confirmation message.
+    """
+    rows = [
+        (item[0], item[1], item[2] if len(item) > 2 and item[2] else "preference")
+        for item in items
+        if len(item) >= 2
+    ]
+    if not rows:
+        return dumps({"success": False, "message": "Nothing to remember – provide [key, value] entries."})
+
+    with get_conn() as db:
+        db.executemany(_UPSERT_SQL, rows)
+        db.commit()
+
+    keys = ", ".join(r[0] for r in rows)
+    logger.info("🧠 Remembered %d items: %s", len(rows), keys)
+    return dumps({
+        "success": True,
+        "message": f"Remembered {len(rows)} items: {keys}",
+    })
 
 
 @tool
@@ -49,44 +93,32 @@ def recall(key: str = "", category: str = "") -> str:
     Returns:
         The remembered information.
     """
-    db = get_db()
-
     if key:
-        row = db.execute(
-            "SELECT key, value, category, updated_at FROM memory WHERE key = ?",
-            (key,),
-        ).fetchone()
-        db.close()
+        with get_conn() as db:
+            row = db.execute(_GET_SQL, (key,)).fetchone()
 
         if not row:
-            return json.dumps({"found": False, "message": f"No information stored for '{key}'."}, ensure_ascii=False)
+            return dumps({"found": False, "message": f"No information stored for '{key}'."})
 
-        logger.info(f"🧠 Recalled: {key} = {row['value']}")
-        return json.dumps({
+        logger.info("🧠 Recalled: %s = %s", key, row["value"])
+        return dumps({
             "found": True,
             "key": row["key"],
             "value": row["value"],
             "category": row["category"],
-        }, ensure_ascii=False)
+        })
     else:
-        if category:
-            rows = db.execute(
-                "SELECT key, value, category FROM memory WHERE category = ? ORDER BY key",
-                (category,),
-            ).fetchall()
-        else:
-            rows = db.execute(
-                "SELECT key, value, category FROM memory ORDER BY category, key"
-            ).fetchall()
-        db.close()
-
-        memories = [{"key": r["key"], "value": r["value"], "category": r["category"]} for r in rows]
+        with get_conn() as db:
+            if category:
+                count, result = db.execute(_LIST_BY_CATEGORY_SQL, (category,)).fetchone()
+            else:
+                count, result = db.execute(_LIST_SQL).fetchone()
 
-        if not memories:
-            return json.dumps({"memories": [], "message": "No memories stored yet."}, ensure_ascii=False)
+        if not count:
+            return dumps({"memories": [], "message": "No memories stored yet."})
 
-        logger.info(f"🧠 Recalled {len(memories)} memories")
-        return json.dumps({"memories": memories}, ensure_ascii=False)
+        logger.info("🧠 Recalled %d memories", count)
+        return result
 
 
 @tool
@@ -99,14 +131,12 @@ def forget(key: str) -> str:
     Returns:
         Confirmation message.
     """
-    db = get_db()
-    result = db.execute("DELETE FROM memory WHERE key = ?", (key,))
-    db.commit()
-    affected = result.rowcount
-    db.close()
+    with get_conn() as db:
+        affected = db.execute(_DELETE_SQL, (key,)).rowcount
+        db.commit()
 
     if affected == 0:
-        return json.dumps({"success": False, "message": f"No memory found for '{key}'."}, ensure_ascii=False)
+        return dumps({"success": False, "message": f"No memory found for '{key}'."})
 
-    logger.info(f"🧠 Forgot: {key}")
-    return json.dumps({"success": True, "message": f"Forgotten: {key}"}, ensure_ascii=False)
+    logger.info("🧠 Forgot: %s", key)
+    return dumps({"success": True, "message": f"Forgotten: {key}"})
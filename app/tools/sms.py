@@ -1,45 +1,85 @@
 """SMS Tool – send emergency SMS messages via Amazon SNS."""
 
-import json
+import atexit
 import logging
+import queue
+import threading
 
-import boto3
 from botocore.exceptions import ClientError
 from strands import tool
 
-from app.config import AWS_REGION
-from app.tools.database import get_db
+from app.tools.aws import sns_client
+from app.tools.database import fts_query, get_conn
+from app.tools.envelope import dumps
 
 logger = logging.getLogger(__name__)
 
-# SNS client (lazy init)
-_sns_client = None
+# Contact lookup: FTS prefix match first, substring LIKE only if that misses.
+# An exact (case-insensitive) name match wins over a partial one.
+_FIND_CONTACT_FTS_SQL = """SELECT c.id, c.name, c.fullname, c.phone, c.relationship
+                           FROM contacts_fts f JOIN emergency_contacts c ON c.id = f.rowid
+                           WHERE contacts_fts MATCH ? AND c.active = 1
+                           ORDER BY c.name = ? COLLATE NOCASE DESC, f.rank LIMIT 1"""
+_FIND_CONTACT_LIKE_SQL = """SELECT id, name, fullname, phone, relationship
+                            FROM emergency_contacts
+                            WHERE active = 1 AND (name LIKE ? OR name = ? COLLATE NOCASE)
+                            ORDER BY name = ? COLLATE NOCASE DESC, name LIMIT 1"""
+_LIST_CONTACTS_SQL = "SELECT name, relationship FROM emergency_contacts WHERE active = 1 ORDER BY name"
+_LOG_SQL = """INSERT INTO sms_log
+              (contact_id, contact_name, phone, message, sns_message_id, status, error_detail)
+              VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+# sms_log rows are written by a background thread, off the send path
+_log_queue: queue.Queue = queue.Queue()
+_log_thread: threading.Thread | None = None
+_log_thread_lock = threading.Lock()
+
+
+def _write_log_batch(batch: list[tuple]):
+    """Insert queued sms_log rows in one transaction."""
+    try:
+        with get_conn() as db:
+            db.executemany(_LOG_SQL, batch)
+            db.commit()
+    except Exception as e:
+        logger.error("Failed to log %d SMS: %s", len(batch), e)
+
+
+def _drain_log_queue(batch: list[tuple]) -> list[tuple]:
+    """Append everything currently queued to batch without blocking."""
+    while True:
+        try:
+            batch.append(_log_queue.get_nowait())
+        except queue.Empty:
+            return batch
 
 
-def _get_sns_client():
-    """Get or create the SNS client."""
-    global _sns_client
-    if _sns_client is None:
-        _sns_client = boto3.client("sns", region_name=AWS_REGION)
-    return _sns_client
+def _log_writer():
+    """Block for the next row, then write it together with anything queued behind it."""
+    while True:
+        _write_log_batch(_drain_log_queue([_log_queue.get()]))
+
+
+@atexit.register
+def _flush_sms_log():
+    """Write rows still queued at shutdown."""
+    batch = _drain_log_queue([])
+    if batch:
+        _write_log_batch(batch)
 
 
 def _log_sms(contact_id: int | None, contact_name: str, phone: str,
              message: str, sns_message_id: str | None,
              status: str, error_detail: str | None = None):
-    """Log an SMS send attempt to the database."""
-    try:
-        db = get_db()
-        db.execute(
-            """INSERT INTO sms_log
-               (contact_id, contact_name, phone, message, sns_message_id, status, error_detail)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (contact_id, contact_name, phone, message, sns_message_id, status, error_detail),
-        )
-        db.commit()
-        db.close()
-    except Exception as e:
-        logger.error(f"Failed to log SMS: {e}")
+    """Queue an SMS send attempt for logging to the database."""
+    global _log_thread
+    if _log_thread is None:
+        with _log_thread_lock:
+            if _log_thread is None:
+                _log_thread = threading.Thread(target=_log_writer, name="sms-log", daemon=True)
+                _log_thread.start()
+    _log_queue.put((contact_id, contact_name, phone, message, sns_message_id, status, error_detail))
 
 
 @tool
@@ -56,50 +96,34 @@ def send_emergency_sms(contact_name: str, message: str) -> str:
     Returns:
         Confirmation with delivery details, or error if contact not found or SMS failed.
     """
-    db = get_db()
+    with get_conn() as db:
+        row = None
+        query = fts_query(contact_name)
+        if query:
+            row = db.execute(_FIND_CONTACT_FTS_SQL, (query, contact_name)).fetchone()
+        if not row:
+            row = db.execute(
+                _FIND_CONTACT_LIKE_SQL, (f"%{contact_name}%", contact_name, contact_name)
+            ).fetchone()
 
-    # Look up contact by name (case-insensitive, partial match)
-    row = db.execute(
-        """SELECT id, name, fullname, phone, relationship
-           FROM emergency_contacts
-           WHERE active = 1 AND LOWER(name) LIKE LOWER(?)
-           ORDER BY name LIMIT 1""",
-        (f"%{contact_name}%",),
-    ).fetchone()
-
-    if not row:
-        # Try exact match
-        row = db.execute(
-            """SELECT id, name, fullname, phone, relationship
-               FROM emergency_contacts
-               WHERE active = 1 AND LOWER(name) = LOWER(?)
-               LIMIT 1""",
-            (contact_name,),
-        ).fetchone()
-
-    db.close()
+        # List available contacts for the agent to suggest
+        all_contacts = None if row else db.execute(_LIST_CONTACTS_SQL).fetchall()
 
     if not row:
-        # List available contacts for the agent to suggest
-        db2 = get_db()
-        all_contacts = db2.execute(
-            "SELECT name, relationship FROM emergency_contacts WHERE active = 1 ORDER BY name"
-        ).fetchall()
-        db2.close()
 
         if all_contacts:
             names = ", ".join(f"{c['name']} ({c['relationship']})" for c in all_contacts)
-            return json.dumps({
+            return dumps({
                 "success": False,
                 "message": f"No emergency contact found matching '{contact_name}'. "
                            f"Available contacts: {names}",
-            }, ensure_ascii=False)
+            })
         else:
-            return json.dumps({
+            return dumps({
                 "success": False,
                 "message": "No emergency contacts saved yet. "
                            "Please add contacts first using add_emergency_contact.",
-            }, ensure_ascii=False)
+            })
 
     contact_id = row["id"]
     name = row["name"]
@@ -110,16 +134,15 @@ def send_emergency_sms(contact_name: str, message: str) -> str:
     # Validate phone number (basic check)
     if not phone or len(phone) < 8:
         _log_sms(contact_id, name, phone or "?", message, None, "error", "Invalid phone number")
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"Contact '{name}' has an invalid phone number: '{phone}'. "
                        f"Please update it first.",
-        }, ensure_ascii=False)
+        })
 
     # Send via Amazon SNS
     try:
-        sns = _get_sns_client()
-        response = sns.publish(
+        response = sns_client.publish(
             PhoneNumber=phone,
             Message=message,
             MessageAttributes={
@@ -135,35 +158,35 @@ def send_emergency_sms(contact_name: str, message: str) -> str:
         )
 
         message_id = response.get("MessageId", "unknown")
-        logger.info(f"📱 SMS sent to {name} ({phone}): MessageId={message_id}")
+        logger.info("📱 SMS sent to %s (%s): MessageId=%s", name, phone, message_id)
 
         _log_sms(contact_id, name, phone, message, message_id, "sent")
 
-        return json.dumps({
+        return dumps({
             "success": True,
             "message": f"SMS sent to {fullname} ({relationship}) at {phone}.",
             "sns_message_id": message_id,
-        }, ensure_ascii=False)
+        })
 
     except ClientError as e:
         error_code = e.response["Error"]["Code"]
         error_msg = e.response["Error"]["Message"]
-        logger.error(f"📱 SNS error sending to {name} ({phone}): {error_code} - {error_msg}")
+        logger.error("📱 SNS error sending to %s (%s): %s - %s", name, phone, error_code, error_msg)
 
         _log_sms(contact_id, name, phone, message, None, "failed", f"{error_code}: {error_msg}")
 
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"Failed to send SMS to {name}: {error_msg}",
             "error_code": error_code,
-        }, ensure_ascii=False)
+        })
 
     except Exception as e:
-        logger.error(f"📱 Unexpected error sending SMS to {name}: {e}")
+        logger.error("📱 Unexpected error sending SMS to %s: %s", name, e)
 
         _log_sms(contact_id, name, phone, message, None, "error", str(e))
 
-        return json.dumps({
+        return dumps({
             "success": False,
             "message": f"Unexpected error sending SMS to {name}: {str(e)}",
-        }, ensure_ascii=False)
+        })
@@ -2,25 +2,87 @@
 
 Flow:
   1. User taps camera button → captures photo → sent via WebSocket
-  2. Photo stored in websocket_handler._current_photo
+  2. Photo decoded once and stored as bytes in websocket_handler._current_photo
   3. Agent calls analyze_photo(question) → Nova 2 Lite Converse API
   4. Returns text description spoken by Nova Sonic
 """
 
-import base64
-import json
+import asyncio
+import io
 import logging
 
-import boto3
 from strands import tool
 
-from app.config import AWS_REGION
+from app.tools.aws import bedrock_runtime_client
+from app.tools.envelope import dumps
+
+try:
+    from PIL import Image, ImageOps  # optional: downscale photos before upload
+except ImportError:
+    Image = None
 
 logger = logging.getLogger(__name__)
 
 # Nova 2 Lite model for vision (multimodal)
 VISION_MODEL_ID = "amazon.nova-lite-v1:0"
 
+# Nova Lite gains nothing past ~1024 px on the long side; smaller files are sent as-is
+MAX_PHOTO_SIDE = 1024
+DOWNSCALE_MIN_BYTES = 200_000
+JPEG_QUALITY = 82
+
+VISION_SYSTEM_PROMPT = (
+    "You are a helpful vision assistant for an elderly person. "
+    "Describe what you see clearly and concisely in 2-3 sentences. "
+    "Focus on the most important and useful information. "
+    "If you see text, read it out. If you see medication, identify it. "
+    "If you see a building or place, describe it. "
+    "Respond in the same language as the user's question."
+)
+
+
+def downscale_photo(image_bytes: bytes) -> bytes:
+    """Shrink a photo to MAX_PHOTO_SIDE as JPEG; returns the input when that doesn't help."""
+    if Image is None or len(image_bytes) < DOWNSCALE_MIN_BYTES:
+        return image_bytes
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            # Let the JPEG decoder scale down by DCT first – far cheaper than a full decode
+            img.draft("RGB", (MAX_PHOTO_SIDE, MAX_PHOTO_SIDE))
+            # Bake in EXIF rotation, which re-encoding would otherwise drop
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((MAX_PHOTO_SIDE, MAX_PHOTO_SIDE), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY)
+    except Exception as e:
+        logger.warning("📸 Could not downscale photo, sending original: %s", e)
+        return image_bytes
+    small = buf.getvalue()
+    return small if len(small) < len(image_bytes) else image_bytes
+
+
+def describe_image(image_bytes: bytes, question: str, system_prompt: str) -> str:
+    """Ask Nova 2 Lite about a JPEG via the Converse API; returns the reply text."""
+    response = bedrock_runtime_client.converse(
+        modelId=VISION_MODEL_ID,
+        messages=[{
+            "role": "user",
+            "content": [
+                {"image": {"format": "jpeg", "source": {"bytes": image_bytes}}},
+                {"text": question},
+            ],
+        }],
+        inferenceConfig={"maxTokens": 512, "temperature": 0.3},
+        system=[{"text": system_prompt}],
+    )
+    content = response.get("output", {}).get("message", {}).get("content", [])
+    return "".join(block["text"] for block in content if "text" in block)
+
+
+async def describe_image_async(image_bytes: bytes, question: str, system_prompt: str) -> str:
+    """describe_image() on a worker thread, so the event loop keeps running."""
+    return await asyncio.to_thread(describe_image, image_bytes, question, system_prompt)
+
 
 @tool
 def analyze_photo(question: str = "What do you see in this image? Describe it clearly and concisely.") -> str:
@@ -45,78 +107,23 @@ def analyze_photo(question: str = "What do you see in this image? Describe it cl
     """
     from app.websocket_handler import get_current_photo
 
-    photo_data = get_current_photo()
-    if not photo_data:
-        return json.dumps({
+    image_bytes = get_current_photo()
+    if not image_bytes:
+        return dumps({
             "error": "No photo available. Ask the user to take a photo first using the camera button."
         })
 
     try:
-        # Decode base64 to bytes
-        if "," in photo_data:
-            # Strip data:image/jpeg;base64, prefix if present
-            photo_data = photo_data.split(",", 1)[1]
-
-        image_bytes = base64.b64decode(photo_data)
-        logger.info(f"📸 Analyzing photo: {len(image_bytes)} bytes, question: {question[:80]}")
-
-        # Call Nova 2 Lite via Converse API
-        client = boto3.client("bedrock-runtime", region_name=AWS_REGION)
-
-        response = client.converse(
-            modelId=VISION_MODEL_ID,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "image": {
-                                "format": "jpeg",
-                                "source": {
-                                    "bytes": image_bytes
-                                }
-                            }
-                        },
-                        {
-                            "text": question
-                        }
-                    ]
-                }
-            ],
-            inferenceConfig={
-                "maxTokens": 512,
-                "temperature": 0.3,
-            },
-            system=[
-                {
-                    "text": (
-                        "You are a helpful vision assistant for an elderly person. "
-                        "Describe what you see clearly and concisely in 2-3 sentences. "
-                        "Focus on the most important and useful information. "
-                        "If you see text, read it out. If you see medication, identify it. "
-                        "If you see a building or place, describe it. "
-                        "Respond in the same language as the user's question."
-                    )
-                }
-            ]
-        )
-
-        # Extract text from response
-        output = response.get("output", {})
-        message = output.get("message", {})
-        content = message.get("content", [])
-
-        result_text = ""
-        for block in content:
-            if "text" in block:
-                result_text += block["text"]
+        logger.info("📸 Analyzing photo: %d bytes, question: %s", len(image_bytes), question[:80])
+
+        result_text = describe_image(image_bytes, question, VISION_SYSTEM_PROMPT)
 
         if not result_text:
             result_text = "I could not analyze the photo. Please try taking another one."
 
-        logger.info(f"📸 Vision result: {result_text[:200]}")
-        return json.dumps({"description": result_text}, ensure_ascii=False)
+        logger.info("📸 Vision result: %s", result_text[:200])
+        return dumps({"description": result_text})
 
     except Exception as e:
-        logger.error(f"📸 Vision error: {e}")
-        return json.dumps({"error": f"Photo analysis failed: {str(e)}"})
+        logger.error("📸 Vision error: %s", e)
+        return dumps({"error": f"Photo analysis failed: {str(e)}"})
@@ -4,16 +4,50 @@ Provides current weather and hourly forecast up to 7 days.
 Works purely with GPS coordinates.
 """
 
-import json
 import logging
-import urllib.request
-import urllib.error
-from datetime import datetime, timezone
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
 
+import httpx
 from strands import tool
+from app.tools.envelope import dumps, loads
 
 logger = logging.getLogger(__name__)
 
+# Forecast request; only the coordinates vary per call
+_URL_TMPL = (
+    "https://api.open-meteo.com/v1/forecast"
+    "?latitude={lat}&longitude={lon}"
+    "&current=temperature_2m,relative_humidity_2m,apparent_temperature,"
+    "weather_code,wind_speed_10m,precipitation"
+    "&hourly=temperature_2m,weather_code,precipitation_probability,"
+    "wind_speed_10m,apparent_temperature"
+    "&forecast_hours=25"  # hourly series from the current hour: just the 24h we use
+    "&daily=weather_code,temperature_2m_max,temperature_2m_min,"
+    "precipitation_sum,precipitation_probability_max,sunrise,sunset"
+    "&timezone=auto"
+    "&forecast_days=3"
+)
+
+# Shared keep-alive pool: repeat calls skip the TCP/TLS handshake. Tools run
+# in worker threads (sync httpx.Client is thread-safe), not on the event loop
+_client = httpx.Client(
+    timeout=10.0,
+    headers={"User-Agent": "Sonic2Life/1.0"},
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+
+# Forecasts per ~1 km grid cell: (round(lat, 2), round(lon, 2)) →
+# (expires at monotonic time, result dict, JSON). Expired entries are kept
+# (LRU-bounded) as a fallback for when Open-Meteo fails. Tools run on worker
+# threads, so every access goes through _cache_lock.
+CACHE_TTL_SECONDS = 300
+_CACHE_MAX_ENTRIES = 16
+_cache: OrderedDict[tuple[float, float], tuple[float, dict, str]] = OrderedDict()
+_cache_lock = threading.Lock()
+
 # WMO Weather interpretation codes → human-readable descriptions
 WMO_CODES = {
     0: "Clear sky",
@@ -46,9 +80,33 @@ WMO_CODES = {
     99: "Thunderstorm with heavy hail",
 }
 
+# WMO code groups that trigger a recommendation
+_RAIN_CODES = frozenset({61, 63, 65, 66, 67, 80, 81, 82})
+_SNOW_CODES = frozenset({71, 73, 75, 85, 86})
+_STORM_CODES = frozenset({95, 96, 99})
+_FOG_CODES = frozenset({45, 48})
+
+
+def _weather_tip_for(code: int) -> str:
+    """Recommendation that depends only on the weather code ("" if none)."""
+    if code in _RAIN_CODES:
+        return "Rain expected – take an umbrella"
+    if code in _SNOW_CODES:
+        return "Snow expected – be careful on slippery surfaces"
+    if code in _STORM_CODES:
+        return "Thunderstorm – better stay indoors"
+    if code in _FOG_CODES:
+        return "Foggy – reduced visibility, be careful"
+    return ""
+
+
+# WMO code → (description, weather tip), resolved once at import
+_CODE_INFO = {code: (desc, _weather_tip_for(code)) for code, desc in WMO_CODES.items()}
+
 
 def _wmo_description(code: int) -> str:
-    return WMO_CODES.get(code, f"Unknown ({code})")
+    info = _CODE_INFO.get(code)
+    return info[0] if info is not None else f"Unknown ({code})"
 
 
 def _senior_recommendations(temp: float, wind: float, weather_code: int) -> str:
@@ -66,14 +124,9 @@ def _senior_recommendations(temp: float, wind: float, weather_code: int) -> str:
     if wind > 10:
         tips.append("Strong wind – be careful outside")
 
-    if weather_code in (61, 63, 65, 66, 67, 80, 81, 82):
-        tips.append("Rain expected – take an umbrella")
-    elif weather_code in (71, 73, 75, 85, 86):
-        tips.append("Snow expected – be careful on slippery surfaces")
-    elif weather_code in (95, 96, 99):
-        tips.append("Thunderstorm – better stay indoors")
-    elif weather_code in (45, 48):
-        tips.append("Foggy – reduced visibility, be careful")
+    info = _CODE_INFO.get(weather_code)
+    if info is not None and info[1]:
+        tips.append(info[1])
 
     return "; ".join(tips) if tips else "Nice weather for a walk"
 
@@ -98,23 +151,21 @@ def get_weather(lat: float, lon: float) -> str:
     Returns:
         JSON with current weather, hourly forecast (24h), and daily forecast (3 days).
     """
+    key = (round(lat, 2), round(lon, 2))
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > now:
+            _cache.move_to_end(key)
+            return hit[2]
+    lat, lon = key
+
     try:
-        url = (
-            f"https://api.open-meteo.com/v1/forecast"
-            f"?latitude={lat}&longitude={lon}"
-            f"&current=temperature_2m,relative_humidity_2m,apparent_temperature,"
-            f"weather_code,wind_speed_10m,precipitation"
-            f"&hourly=temperature_2m,weather_code,precipitation_probability,"
-            f"wind_speed_10m,apparent_temperature"
-            f"&daily=weather_code,temperature_2m_max,temperature_2m_min,"
-            f"precipitation_sum,precipitation_probability_max,sunrise,sunset"
-            f"&timezone=auto"
-            f"&forecast_days=3"
-        )
-
-        req = urllib.request.Request(url, headers={"User-Agent": "Sonic2Life/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
+        url = _URL_TMPL.format(lat=lat, lon=lon)
+
+        resp = _client.get(url)
+        resp.raise_for_status()
+        data = loads(resp.content)
 
         # ── Current weather ──
         current = data.get("current", {})
@@ -149,24 +200,32 @@ def get_weather(lat: float, lon: float) -> str:
         hourly_wind = hourly.get("wind_speed_10m", [])
         hourly_feels = hourly.get("apparent_temperature", [])
 
-        # Find current hour index
+        # Find current hour index on the hourly grid (starts at the current hour)
         now_str = current.get("time", "")[:13]  # "2024-01-15T14"
         start_idx = 0
-        for i, t in enumerate(hourly_times):
-            if t.startswith(now_str):
-                start_idx = i
-                break
-
-        forecast_hours = []
-        for i in range(start_idx, min(start_idx + 25, len(hourly_times)), 3):
-            forecast_hours.append({
-                "time": hourly_times[i] if i < len(hourly_times) else "",
-                "temp": f"{hourly_temps[i]}°C" if i < len(hourly_temps) else "",
-                "feels_like": f"{hourly_feels[i]}°C" if i < len(hourly_feels) else "",
-                "description": _wmo_description(hourly_codes[i]) if i < len(hourly_codes) else "",
-                "rain_chance": f"{hourly_precip_prob[i]}%" if i < len(hourly_precip_prob) else "",
-                "wind": f"{hourly_wind[i]} km/h" if i < len(hourly_wind) else "",
-            })
+        if hourly_times and now_str:
+            elapsed = datetime.fromisoformat(now_str + ":00") - datetime.fromisoformat(hourly_times[0])
+            start_idx = max(0, min(int(elapsed.total_seconds()) // 3600, len(hourly_times) - 1))
+            if not hourly_times[start_idx].startswith(now_str):
+                # Local-time grid shifted by a DST change – fall back to a scan
+                start_idx = next((i for i, t in enumerate(hourly_times) if t.startswith(now_str)), 0)
+
+        # Every 3rd hour over the next 24h; Open-Meteo returns aligned arrays
+        window = slice(start_idx, start_idx + 25, 3)
+        forecast_hours = [
+            {
+                "time": t,
+                "temp": f"{temp}°C",
+                "feels_like": f"{feels}°C",
+                "description": _wmo_description(code),
+                "rain_chance": f"{prob}%",
+                "wind": f"{wind} km/h",
+            }
+            for t, temp, feels, code, prob, wind in zip(
+                hourly_times[window], hourly_temps[window], hourly_feels[window],
+                hourly_codes[window], hourly_precip_prob[window], hourly_wind[window],
+            )
+        ]
 
         result["hourly_forecast"] = forecast_hours
 
@@ -181,27 +240,40 @@ def get_weather(lat: float, lon: float) -> str:
         daily_sunrise = daily.get("sunrise", [])
         daily_sunset = daily.get("sunset", [])
 
-        forecast_days = []
-        for i in range(len(daily_times)):
-            forecast_days.append({
-                "date": daily_times[i],
-                "description": _wmo_description(daily_codes[i]) if i < len(daily_codes) else "",
-                "temp_max": f"{daily_max[i]}°C" if i < len(daily_max) else "",
-                "temp_min": f"{daily_min[i]}°C" if i < len(daily_min) else "",
-                "precipitation": f"{daily_precip[i]} mm" if i < len(daily_precip) else "",
-                "rain_chance": f"{daily_precip_prob[i]}%" if i < len(daily_precip_prob) else "",
-                "sunrise": daily_sunrise[i][-5:] if i < len(daily_sunrise) else "",
-                "sunset": daily_sunset[i][-5:] if i < len(daily_sunset) else "",
-            })
+        forecast_days = [
+            {
+                "date": day,
+                "description": _wmo_description(code),
+                "temp_max": f"{t_max}°C",
+                "temp_min": f"{t_min}°C",
+                "precipitation": f"{precip} mm",
+                "rain_chance": f"{prob}%",
+                "sunrise": sunrise[-5:],
+                "sunset": sunset[-5:],
+            }
+            for day, code, t_max, t_min, precip, prob, sunrise, sunset in zip(
+                daily_times, daily_codes, daily_max, daily_min,
+                daily_precip, daily_precip_prob, daily_sunrise, daily_sunset,
+            )
+        ]
 
         result["daily_forecast"] = forecast_days
 
-        logger.info(f"🌤️ Weather: {current_temp}°C, {_wmo_description(current_code)}")
-        return json.dumps(result, ensure_ascii=False)
+        logger.info("🌤️ Weather: %s°C, %s", current_temp, result["current"]["description"])
+        payload = dumps(result)
+        with _cache_lock:
+            _cache[key] = (now + CACHE_TTL_SECONDS, result, payload)
+            _cache.move_to_end(key)
+            if len(_cache) > _CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+        return payload
 
-    except urllib.error.URLError as e:
-        logger.error(f"Weather API error: {e}")
-        return json.dumps({"error": f"Could not fetch weather: {e}"})
+    except httpx.HTTPError as e:
+        if hit is not None:
+            logger.warning("Weather API error, serving cached forecast: %s", e)
+            return dumps({**hit[1], "warning": "Weather service unreachable, showing an earlier forecast"})
+        logger.error("Weather API error: %s", e)
+        return dumps({"error": f"Could not fetch weather: {e}"})
     except Exception as e:
-        logger.error(f"Weather error: {e}")
-        return json.dumps({"error": str(e)})
+        logger.error("Weather error: %s", e)
+        return dumps({"error": str(e)})
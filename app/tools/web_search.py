@@ -1,12 +1,27 @@
 """Web search tool using DuckDuckGo. No API key required."""
 
-import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 
 from strands import tool
+from app.tools.envelope import dumps
 
 logger = logging.getLogger(__name__)
 
+# One DDGS client for the process, so repeat searches reuse its HTTP session;
+# the lock serializes use from concurrent tool threads
+_ddgs = None
+_ddgs_lock = threading.Lock()
+
+# Recent answers: (normalized query, max_results) → (expires at, JSON); its own
+# lock, so cache hits don't wait behind a search in progress
+CACHE_TTL_SECONDS = 60
+_CACHE_MAX_ENTRIES = 128
+_cache: OrderedDict[tuple[str, int], tuple[float, str]] = OrderedDict()
+_cache_lock = threading.Lock()
+
 
 @tool
 def web_search(query: str, max_results: int = 5) -> str:
@@ -27,14 +42,24 @@ def web_search(query: str, max_results: int = 5) -> str:
     """
     max_results = min(max(1, max_results), 10)
 
-    try:
-        from duckduckgo_search import DDGS
+    global _ddgs
+    key = (" ".join(query.lower().split()), max_results)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > now:
+            _cache.move_to_end(key)
+            return hit[1]
 
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
+    try:
+        with _ddgs_lock:
+            if _ddgs is None:
+                from duckduckgo_search import DDGS
+                _ddgs = DDGS()
+            results = list(_ddgs.text(query, max_results=max_results))
 
         if not results:
-            return json.dumps({"results": [], "message": f"No results found for: {query}"})
+            return dumps({"results": [], "message": f"No results found for: {query}"})
 
         formatted = []
         for r in results:
@@ -44,12 +69,19 @@ def web_search(query: str, max_results: int = 5) -> str:
                 "snippet": r.get("body", ""),
             })
 
-        logger.info(f"🔍 Web search: '{query}' → {len(formatted)} results")
-        return json.dumps({"query": query, "results": formatted}, ensure_ascii=False)
+        logger.info("🔍 Web search: '%s' → %d results", query, len(formatted))
+        payload = dumps({"query": query, "results": formatted})
+        with _cache_lock:
+            _cache[key] = (now + CACHE_TTL_SECONDS, payload)
+            _cache.move_to_end(key)
+            if len(_cache) > _CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+        return payload
 
     except ImportError:
         logger.error("duckduckgo-search package not installed")
-        return json.dumps({"error": "Web search not available. Install: pip install duckduckgo-search"})
+        return dumps({"error": "Web search not available. Install: pip install duckduckgo-search"})
     except Exception as e:
-        logger.error(f"Web search error: {e}")
-        return json.dumps({"error": f"Search failed: {str(e)}"})
+        logger.error("Web search error: %s", e)
+        _ddgs = None  # start from a fresh session next time
+        return dumps({"error": f"Search failed: {str(e)}"})
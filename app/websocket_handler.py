@@ -18,98 +18,106 @@ Protocol:
 """
 
 import asyncio
+import binascii
 import json
 import logging
+from typing import NamedTuple
 
-import numpy as np
 from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
 
+from app.audio_resample import Resampler
 from app.nova_sonic import NovaSonicSession
+from app.tools.envelope import dumps, loads
 
 logger = logging.getLogger(__name__)
 
-OUTPUT_SAMPLE_RATE = 24000
-CLIENT_SAMPLE_RATE = 16000
 
+# Outgoing audio batching: 8 KB ≈ 256 ms of 16 kHz PCM; 40 ms max added latency
+AUDIO_FLUSH_BYTES = 8192
+AUDIO_FLUSH_SECONDS = 0.04
 
-def resample_24k_to_16k(pcm_24k: bytes) -> bytes:
-    samples = np.frombuffer(pcm_24k, dtype=np.int16).astype(np.float32)
-    ratio = CLIENT_SAMPLE_RATE / OUTPUT_SAMPLE_RATE
-    out_len = int(len(samples) * ratio)
-    indices = np.linspace(0, len(samples) - 1, out_len)
-    resampled = np.interp(indices, np.arange(len(samples)), samples)
-    return resampled.astype(np.int16).tobytes()
+# Slow client: once more than AUDIO_BACKLOG_MAX messages wait in the session
+# queue, skip up to AUDIO_MAX_DROP stale audio chunks per send ("newest wins")
+# so the Sonic reader never blocks on a full queue and misses barge-in/tool events
+AUDIO_BACKLOG_MAX = 20
+AUDIO_MAX_DROP = 10
 
+# Constant control frames, encoded once
+_DONE_FRAME = dumps({"type": "done"})
+_BARGE_IN_FRAME = dumps({"type": "barge_in"})
 
 # Global GPS storage (per-connection, updated by frontend)
-_current_gps = {"lat": None, "lon": None, "accuracy": None}
+class GPSFix(NamedTuple):
+    lat: float | None = None
+    lon: float | None = None
+    accuracy: float | None = None
 
-# Global photo storage (per-connection, updated by frontend camera)
-_current_photo = None  # base64 JPEG string
 
+# Replaced whole on each update, so readers never see a half-updated fix
+_current_gps = GPSFix()
+
+# Incoming audio frames across sessions; every 64th is logged
+_audio_count = 0
 
-def get_current_gps():
+# Global photo storage (per-connection, updated by frontend camera)
+_current_photo = None  # decoded JPEG bytes
+
+# Prompts for the automatic description sent right after a photo arrives
+_AUTO_PHOTO_QUESTION = (
+    "What do you see in this image? Describe it clearly and concisely in 2-3 sentences. "
+    "If you see text, read it. If you see medication, identify it."
+)
+_AUTO_PHOTO_SYSTEM_PROMPT = (
+    "You are a helpful vision assistant for an elderly person. "
+    "Describe what you see clearly and concisely. "
+    "Focus on the most important and useful information. "
+    "If you see text, read it out. If you see medication, identify it."
+)
+
+
+def get_current_gps() -> GPSFix:
     """Get the latest GPS coordinates from the frontend."""
-    return _current_gps.copy()
+    return _current_gps
 
 
 def get_current_photo():
-    """Get the latest photo captured by the user. Returns base64 string or None."""
+    """Get the latest photo captured by the user. Returns JPEG bytes or None."""
     return _current_photo
 
 
+def _decode_photo(photo_data: str) -> bytes:
+    """Decode a base64 photo (optionally a data: URI) without copying the payload."""
+    raw = memoryview(photo_data.encode("ascii"))
+    # Skip a "data:image/jpeg;base64," prefix by index instead of split()
+    idx = photo_data.find(",")
+    return binascii.a2b_base64(raw[idx + 1:] if idx >= 0 else raw)
+
+
 async def _auto_analyze_photo(ws: WebSocket, session):
     """Analyze the current photo in background and inject result into Nova Sonic session."""
     try:
-        photo_data = _current_photo
-        if not photo_data:
+        image_bytes = _current_photo
+        if not image_bytes:
             return
 
         # Notify frontend that analysis is in progress
         await ws.send_json({"type": "photo_analyzing"})
 
-        # Call Nova 2 Lite vision directly (faster than going through Strands Agent)
-        import base64
-        import boto3
-        from app.config import AWS_REGION
-
-        if "," in photo_data:
-            photo_data = photo_data.split(",", 1)[1]
-
-        image_bytes = base64.b64decode(photo_data)
-        logger.info(f"📸 Auto-analyzing photo: {len(image_bytes)} bytes")
-
-        client = boto3.client("bedrock-runtime", region_name=AWS_REGION)
-
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: client.converse(
-            modelId="amazon.nova-lite-v1:0",
-            messages=[{
-                "role": "user",
-                "content": [
-                    {"image": {"format": "jpeg", "source": {"bytes": image_bytes}}},
-                    {"text": "What do you see in this image? Describe it clearly and concisely in 2-3 sentences. If you see text, read it. If you see medication, identify it."}
-                ]
-            }],
-            inferenceConfig={"maxTokens": 512, "temperature": 0.3},
-            system=[{
-                "text": (
-                    "You are a helpful vision assistant for an elderly person. "
-                    "Describe what you see clearly and concisely. "
-                    "Focus on the most important and useful information. "
-                    "If you see text, read it out. If you see medication, identify it."
-                )
-            }]
-        ))
-
-        # Extract text from response
-        content = response.get("output", {}).get("message", {}).get("content", [])
-        description = "".join(block["text"] for block in content if "text" in block)
+        # Call Nova 2 Lite vision directly (faster than going through Strands Agent);
+        # the shared keep-alive client runs on a worker thread
+        from app.tools.vision import describe_image_async
+
+        logger.info("📸 Auto-analyzing photo: %d bytes", len(image_bytes))
+
+        description = await describe_image_async(
+            image_bytes, _AUTO_PHOTO_QUESTION, _AUTO_PHOTO_SYSTEM_PROMPT
+        )
 
         if not description:
             description = "I could not clearly identify what is in the photo."
 
-        logger.info(f"📸 Vision result: {description[:200]}")
+        logger.info("📸 Vision result: %.200s", description)
 
         # Inject into Nova Sonic session – model will speak the description
         if session and session.is_active:
@@ -119,7 +127,7 @@ async def _auto_analyze_photo(ws: WebSocket, session):
             logger.warning("📸 Session no longer active, cannot inject photo context")
 
     except Exception as e:
-        logger.error(f"📸 Auto-analyze error: {e}")
+        logger.error("📸 Auto-analyze error: %s", e)
         try:
             await ws.send_json({"type": "photo_error", "text": str(e)})
         except Exception:
@@ -127,6 +135,7 @@ async def _auto_analyze_photo(ws: WebSocket, session):
 
 
 async def handle_websocket(ws: WebSocket, tool_specs=None, tool_handler=None):
+    global _audio_count, _current_gps
     await ws.accept()
     logger.info("🔌 WebSocket connected")
 
@@ -146,7 +155,7 @@ async def handle_websocket(ws: WebSocket, tool_specs=None, tool_handler=None):
             try:
                 await session.close()
             except Exception as e:
-                logger.warning(f"Close error: {e}")
+                logger.warning("Close error: %s", e)
             session = None
 
     try:
@@ -156,20 +165,17 @@ async def handle_websocket(ws: WebSocket, tool_specs=None, tool_handler=None):
             # Binary audio → forward to active Nova Sonic session
             if "bytes" in message:
                 if session and session.is_active:
-                    audio_len = len(message["bytes"])
-                    if not hasattr(handle_websocket, '_audio_count'):
-                        handle_websocket._audio_count = 0
-                    handle_websocket._audio_count += 1
-                    if handle_websocket._audio_count % 50 == 1:
-                        logger.info(f"🎤 Audio chunk #{handle_websocket._audio_count}: {audio_len} bytes")
+                    _audio_count += 1
+                    if logger.isEnabledFor(logging.INFO) and (_audio_count & 63) == 1:
+                        logger.info("🎤 Audio chunk #%d: %d bytes", _audio_count, len(message["bytes"]))
                     await session.send_audio(message["bytes"])
                 continue
 
             # JSON control
             if "text" in message:
                 try:
-                    data = json.loads(message["text"])
-                except json.JSONDecodeError:
+                    data = loads(message["text"])
+                except json.JSONDecodeError:  # also catches orjson.JSONDecodeError (a subclass)
                     continue
 
                 msg_type = data.get("type", "")
@@ -177,35 +183,45 @@ async def handle_websocket(ws: WebSocket, tool_specs=None, tool_handler=None):
                 if msg_type == "start":
                     await cleanup()
                     voice_id = data.get("voice_id")
-                    logger.info(f"📨 Start requested: voice={voice_id}")
+                    logger.info("📨 Start requested: voice=%s", voice_id)
 
-                    session = NovaSonicSession(
+                    session = await NovaSonicSession.create(
                         tool_specs=tool_specs,
                         tool_handler=tool_handler,
                         voice_id=voice_id,
                     )
-                    logger.info(f"🔵 Using Nova 2 Sonic (voice={voice_id})")
+                    logger.info("🔵 Using Nova 2 Sonic (voice=%s)", voice_id)
 
                     try:
                         await session.start()
                         forwarder = asyncio.create_task(_forward(ws, session))
                         logger.info("✅ Conversation started (with auto-greeting)")
                     except Exception as e:
-                        logger.error(f"Start failed: {e}")
+                        logger.error("Start failed: %s", e)
                         await ws.send_json({"type": "error", "text": str(e)})
                         session = None
 
                 elif msg_type == "gps":
-                    _current_gps["lat"] = data.get("lat")
-                    _current_gps["lon"] = data.get("lon")
-                    _current_gps["accuracy"] = data.get("accuracy")
-                    logger.info(f"📍 GPS updated: {_current_gps['lat']}, {_current_gps['lon']}")
+                    _current_gps = GPSFix(data.get("lat"), data.get("lon"), data.get("accuracy"))
+                    logger.info("📍 GPS updated: %s, %s", _current_gps.lat, _current_gps.lon)
 
                 elif msg_type == "photo":
                     global _current_photo
-                    _current_photo = data.get("data")
-                    size_kb = len(_current_photo) * 3 // 4 // 1024 if _current_photo else 0
-                    logger.info(f"📸 Photo received: ~{size_kb}KB")
+                    # Decode once at the boundary; tools receive raw bytes
+                    try:
+                        image_bytes = _decode_photo(data["data"]) if data.get("data") else None
+                    except (binascii.Error, UnicodeEncodeError) as e:
+                        logger.warning("📸 Invalid photo data: %s", e)
+                        _current_photo = None
+                        await ws.send_json({"type": "photo_error", "text": "Invalid photo data"})
+                        continue
+                    if image_bytes:
+                        # Downscale off the event loop, once, before any analysis
+                        from app.tools.vision import downscale_photo
+                        image_bytes = await asyncio.to_thread(downscale_photo, image_bytes)
+                    _current_photo = image_bytes
+                    size_kb = len(_current_photo) // 1024 if _current_photo else 0
+                    logger.info("📸 Photo received: ~%dKB", size_kb)
                     await ws.send_json({"type": "photo_received", "size_kb": size_kb})
 
                     # Auto-analyze photo and inject result into active session
@@ -214,39 +230,86 @@ async def handle_websocket(ws: WebSocket, tool_specs=None, tool_handler=None):
 
                 elif msg_type == "end":
                     await cleanup()
-                    await ws.send_json({"type": "done"})
+                    await ws.send_text(_DONE_FRAME)
 
     except WebSocketDisconnect:
         logger.info("🔌 Disconnected")
     except Exception as e:
-        logger.error(f"WS error: {e}")
+        logger.error("WS error: %s", e)
     finally:
         await cleanup()
         logger.info("🧹 Cleanup done")
 
 
 async def _forward(ws: WebSocket, session):
+    loop = asyncio.get_running_loop()
+    # Sonic emits ~20 ms chunks; coalesce them into fewer, larger binary
+    # frames, flushed at AUDIO_FLUSH_BYTES or AUDIO_FLUSH_SECONDS after the
+    # first buffered chunk, whichever comes first
+    pending = bytearray()
+    deadline = 0.0
+    resampler = Resampler()
+
+    async def flush():
+        if pending:
+            data = bytes(pending)
+            pending.clear()
+            await ws.send_bytes(data)
+
+    queue = session.output_queue
+    carry = None  # control message pulled from the queue while skipping audio
     try:
-        while session.is_active or not session.output_queue.empty():
-            try:
-                msg = await asyncio.wait_for(session.output_queue.get(), timeout=1.0)
-            except asyncio.TimeoutError:
-                continue
+        while session.is_active or carry is not None or not queue.empty():
+            if ws.client_state is not WebSocketState.CONNECTED:
+                break
+            if carry is not None:
+                msg, carry = carry, None
+            elif pending:
+                # Only buffered audio needs a timer: wake up for its flush deadline
+                try:
+                    msg = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0.0))
+                except asyncio.TimeoutError:
+                    await flush()
+                    continue
+            else:
+                # Idle: block until the next message; the session always ends
+                # with "done", and handle_websocket cancels us on teardown
+                msg = await queue.get()
+
+            if msg["type"] == "audio" and queue.qsize() > AUDIO_BACKLOG_MAX:
+                dropped = 0
+                while dropped < AUDIO_MAX_DROP and queue.qsize() > AUDIO_BACKLOG_MAX:
+                    nxt = queue.get_nowait()
+                    if nxt["type"] != "audio":
+                        carry = nxt
+                        break
+                    msg = nxt
+                    dropped += 1
+                if dropped:
+                    logger.warning("Dropped %d stale audio frames due to backpressure", dropped)
 
             if msg["type"] == "audio":
-                pcm = resample_24k_to_16k(msg["data"])
-                await ws.send_bytes(pcm)
-            elif msg["type"] == "done":
-                await ws.send_json({"type": "done"})
-                break
+                if not pending:
+                    deadline = loop.time() + AUDIO_FLUSH_SECONDS
+                pending += resampler.process(msg["data"])
+                if len(pending) >= AUDIO_FLUSH_BYTES or loop.time() >= deadline:
+                    await flush()
             elif msg["type"] == "barge_in":
-                await ws.send_json({"type": "barge_in"})
+                # The client drops queued playback on barge-in; don't send more
+                pending.clear()
+                await ws.send_text(_BARGE_IN_FRAME)
             else:
-                await ws.send_json({k: v for k, v in msg.items() if k != "data"})
+                await flush()  # keep audio ordered before control frames
+                if msg["type"] == "done":
+                    await ws.send_text(_DONE_FRAME)
+                    break
+                await ws.send_text(dumps({k: v for k, v in msg.items() if k != "data"}))
+        else:
+            await flush()
 
     except asyncio.CancelledError:
         pass
     except WebSocketDisconnect:
         pass
     except Exception as e:
-        logger.error(f"Forward error: {e}")
+        logger.error("Forward error: %s", e)
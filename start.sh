@@ -6,4 +6,4 @@ set -e
 
 cd "$(dirname "$0")"
 
-uvicorn app.main:app --host 0.0.0.0 --port 5005 --reload --proxy-headers --forwarded-allow-ips '*'
+uvicorn app.main:app --host 0.0.0.0 --port 5005 --loop uvloop --reload --proxy-headers --forwarded-allow-ips '*'